@@ -1,6 +1,9 @@
 from decouple import config
 import os
 
+# Project root (the directory holding the app package), for defaults that must not depend on the cwd
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings:
     # Email folder configuration
     EMAIL_FOLDER_PATH: str = config("EMAIL_FOLDER_PATH", default="./emails")
@@ -14,7 +17,17 @@ class Settings:
     HOST: str = config("HOST", default="0.0.0.0")
     PORT: int = config("PORT", default=8000, cast=int)
     DEBUG: bool = config("DEBUG", default=True, cast=bool)
+    # Worker processes when DEBUG is off (reload mode always runs a single worker).
+    # Admin relay writes are serialized across workers with fcntl.flock, so without it
+    # (Windows) only one worker is allowed.
+    WORKERS: int = config("WORKERS", default=1, cast=int) if os.name == "posix" else 1
     
+    # Processes used to parse .msg files in bulk (search, listing); 1 parses in-process
+    PARSE_WORKERS: int = config("PARSE_WORKERS", default=os.cpu_count() or 1, cast=int)
+
+    # sqlite file caching parsed email summaries between requests/restarts; empty disables it
+    SUMMARY_CACHE_PATH: str = config("SUMMARY_CACHE_PATH", default=os.path.join(BASE_DIR, "summary_cache.db"))
+
     # File download limits
     MAX_DOWNLOAD_SIZE: int = config("MAX_DOWNLOAD_SIZE", default=100 * 1024 * 1024, cast=int)  # 100MB
     
@@ -34,5 +47,6 @@ class Settings:
 
     # PMTA relay domains directory (must exist and be writable in production)
     RELAYDOMAINS_PATH: str = config("RELAYDOMAINS_PATH", default="/etc/pmta/relaydomains-c")
+    RELAYDOMAINS_DIR: str = os.path.dirname(RELAYDOMAINS_PATH) or "."
 
 settings = Settings()
@@ -1,7 +1,11 @@
 from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+from jinja2 import FileSystemBytecodeCache
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict
 import logging
 import os
 
@@ -10,6 +14,8 @@ from app.routers import email_router
 from app.routers import auth_router
 from app.routers import admin_router
 from app.security.auth import get_current_user, require_admin
+from app.services.email_service import shutdown_parse_pool
+from app.utils.fs_utils import dir_exists_cached
 
 # Configure logging
 logging.basicConfig(
@@ -17,13 +23,28 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up in-memory state before serving requests"""
+    try:
+        admin_router.load_domain_index()
+    except Exception as e:
+        logger.warning(f"Could not load relay domain index at startup: {e}")
+    yield
+    shutdown_parse_pool()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Include routers
@@ -39,16 +60,35 @@ if os.path.exists(static_path):
 # Templates
 templates_path = os.path.join(os.path.dirname(__file__), "static")
 templates = Jinja2Templates(directory=templates_path)
+# Only re-stat template files on every render while developing; keep compiled
+# templates in an on-disk bytecode cache so restarts/workers skip re-parsing
+templates.env.auto_reload = settings.DEBUG
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+
+# The main and login pages have no template context, so serve their bytes as-is. They are
+# read on first request (and on every request in DEBUG, so edits show up without a restart)
+_PAGE_CACHE: Dict[str, bytes] = {}
+
+def _page_response(name: str) -> Response:
+    page = None if settings.DEBUG else _PAGE_CACHE.get(name)
+    if page is None:
+        try:
+            page = (Path(templates_path) / name).read_bytes()
+        except OSError:
+            logger.error(f"Page not found: {name}")
+            raise HTTPException(status_code=404, detail="Page not found")
+        _PAGE_CACHE[name] = page
+    return Response(page, media_type="text/html")
 
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
+async def read_root():
     """Serve the main HTML page"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return _page_response("index.html")
 
 @app.get("/login", response_class=HTMLResponse)
-async def login_page(request: Request):
+async def login_page():
     """Serve the login page"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return _page_response("login.html")
 
 @app.get("/admin/domains", response_class=HTMLResponse, dependencies=[Depends(require_admin)])
 async def admin_domains_page(request: Request):
@@ -61,7 +101,7 @@ async def health_check():
     return {
         "status": "healthy",
         "email_folder": settings.EMAIL_FOLDER_PATH,
-        "folder_exists": os.path.exists(settings.EMAIL_FOLDER_PATH)
+        "folder_exists": dir_exists_cached(settings.EMAIL_FOLDER_PATH)
     }
 
 if __name__ == "__main__":
@@ -70,5 +110,7 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # uvicorn[standard] picks uvloop/httptools automatically where available (not on Windows)
+        workers=1 if settings.DEBUG else settings.WORKERS
     )
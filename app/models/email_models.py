@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -15,6 +15,9 @@ class FilterType(str, Enum):
     RECIPIENT = "recipient"
 
 class EmailSummary(BaseModel):
+    # Built for every listed email; immutable and without extras keeps validation lean
+    model_config = ConfigDict(frozen=True)
+
     filename: str
     subject: Optional[str] = None
     sender: Optional[str] = None
@@ -40,6 +43,8 @@ class EmailDetail(BaseModel):
     message_id: Optional[str] = None
 
 class EmailListResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     emails: List[EmailSummary]
     total_count: int
     page: int
@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import Dict
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, ConfigDict, StringConstraints, TypeAdapter
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from functools import lru_cache
+import asyncio
 import os
 import re
+import shutil
+import tempfile
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, and settings.WORKERS is pinned to 1 there
+    fcntl = None
+
+import orjson
+
 from app.security.auth import require_admin
 from app.config import settings
+from app.utils.fs_utils import dir_exists_cached
 
 logger = logging.getLogger(__name__)
 
@@ -39,87 +52,249 @@ async def debug_endpoint():
             "type": type(e).__name__
         }
 
-# Regex for domain validation: labels of [a-z0-9-], no leading/trailing hyphen, TLD letters only 2-24
-DOMAIN_REGEX = re.compile(r"^(?=.{1,253}$)(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,24}$")
+# Domain validation: labels of [a-z0-9-], no leading/trailing hyphen, TLD letters only 2-24.
+# The overall 253 char limit is checked separately instead of with a lookahead, which keeps the
+# pattern usable by pydantic-core's linear-time Rust regex engine and cheap for Python's re.
+DOMAIN_MAX_LENGTH = 253
+DOMAIN_PATTERN = r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,24}$"
+DOMAIN_REGEX = re.compile(DOMAIN_PATTERN)
+
+# Validated while the request is parsed, before any handler code runs
+DomainName = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True,
+        to_lower=True,
+        min_length=1,
+        max_length=DOMAIN_MAX_LENGTH,
+        pattern=DOMAIN_PATTERN,
+    ),
+]
+
+# Canonical relay file line prefix: "relay-domain *.<domain>"
+RELAY_LINE_PREFIX = "relay-domain *."
+_RELAY_LINE_PREFIX_BYTES = RELAY_LINE_PREFIX.encode("ascii")
+# More robust pattern that works even if multiple entries are concatenated without newlines
+RELAY_ENTRY_PATTERN = re.compile(r"relay-domain\s+\*\.([A-Za-z0-9.-]+)", re.IGNORECASE)
+
+
+def _relay_line_bytes(domain: str) -> bytes:
+    """Encoded canonical relay file line (newline included) for a domain."""
+    return _RELAY_LINE_PREFIX_BYTES + domain.encode("utf-8") + b"\n"
+
+
+def _is_valid_domain(domain: str) -> bool:
+    """Return True if the (already normalized) domain is a valid domain name."""
+    return 0 < len(domain) <= DOMAIN_MAX_LENGTH and DOMAIN_REGEX.fullmatch(domain) is not None
+
+
+@lru_cache(maxsize=1024)
+def _relay_line_re(domain: str) -> re.Pattern:
+    """Compiled matcher for the relay file line(s) of a domain, shared by all handlers.
+
+    Works on raw bytes; multiline mode lets `$` match before the line's trailing newline.
+    """
+    return re.compile(
+        rb"^[ \t]*relay-domain[ \t]+\*\." + re.escape(domain.encode("utf-8")) + rb"[ \t\r]*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+@contextmanager
+def _relay_write_lock(relay_file: str):
+    """Exclusive lock on "<relay_file>.lock" held across a relay/meta read-modify-write.
+
+    flock() is shared by every worker process, unlike _index_lock which only orders requests
+    within one process. It blocks, so take it inside the worker thread doing the write.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(relay_file + ".lock", "ab") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 
-class AddDomainRequest(BaseModel):
-    domain: str
+def _mkstemp_beside(path: str) -> Tuple[int, str]:
+    """Uniquely named temp file in path's directory (so os.replace() stays on one filesystem)."""
+    return tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
 
 
-@router.post("/domains", status_code=201)
-async def add_domain(body: AddDomainRequest) -> Dict[str, str]:
-    domain_raw = (body.domain or "").strip().lower()
+def _adopt_mode(path: str, tmp_path: str) -> None:
+    """Give the temp file path's permissions (mkstemp creates it 0600)."""
+    if os.path.exists(path):
+        shutil.copymode(path, tmp_path)
+    else:
+        os.chmod(tmp_path, 0o644)
 
-    if not domain_raw:
-        raise HTTPException(status_code=400, detail="Domain is required")
 
-    # Basic validation: only valid domain names, TLD alpha 2-24
-    if not DOMAIN_REGEX.match(domain_raw):
-        raise HTTPException(status_code=400, detail="Invalid domain name. Use a valid domain like example.com")
+def _atomic_write(path: str, data: bytes) -> None:
+    """Crash-safe file replacement: write a temp file, fsync it, then os.replace() it over path."""
+    fd, tmp_path = _mkstemp_beside(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        _adopt_mode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _rewrite_relay_lines(relay_file: str, domain: str, replacement: bytes = b"") -> bool:
+    """Drop every relay line for domain (the first one is swapped for replacement).
+
+    The file is streamed line by line into a temp copy, so memory use stays flat however large
+    the relay file grows; the copy is then fsynced and os.replace()d over the original.
+    Returns False (leaving the file untouched) if the domain has no line in the file.
+    """
+    matcher = _relay_line_re(domain)
+    fd, tmp_path = _mkstemp_beside(relay_file)
+    found = replaced = False
+    try:
+        with os.fdopen(fd, "wb") as dst, open(relay_file, "rb") as src:
+            for line in src:
+                if matcher.match(line):
+                    if not found:
+                        found = True
+                        dst.write(replacement)
+                    continue
+                dst.write(line)
+            if found:
+                dst.flush()
+                os.fsync(dst.fileno())
+        if found:
+            shutil.copymode(relay_file, tmp_path)
+            os.replace(tmp_path, relay_file)
+            replaced = True
+        return found
+    finally:
+        # No match, or an error part way: the temp copy is never left behind
+        if not replaced:
+            os.unlink(tmp_path)
+
+
+class AddDomainRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
+    domain: DomainName
+
+
+async def _add_relay_domains(requested: List[str]) -> Tuple[List[str], List[str]]:
+    """Append the domains not yet in the relay file; shared by the single and bulk add endpoints.
+
+    Returns (added, skipped) where skipped holds the domains that already existed.
+    """
     # Treat RELAYDOMAINS_PATH as a single file to append lines to
     relay_file = settings.RELAYDOMAINS_PATH
-    relay_dir = os.path.dirname(relay_file) or "."
+    relay_dir = settings.RELAYDOMAINS_DIR
     try:
-        if relay_dir and not os.path.isdir(relay_dir):
-            if settings.DEBUG:
-                os.makedirs(relay_dir, exist_ok=True)
-            else:
-                raise HTTPException(status_code=500, detail=f"Relay domains directory not found: {relay_dir}")
+        # An existing relay file implies its directory exists, so only probe the dir when it's missing
+        if _probe(relay_file) is None:
+            _ensure_relay_dir(relay_dir)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error ensuring relay directory exists: {e}")
         raise HTTPException(status_code=500, detail="Failed to access relay domains directory")
 
-    # Check for duplicates if file exists
-    existing_matches = False
-    line_re = re.compile(r"^\s*relay-domain\s+\*\." + re.escape(domain_raw) + r"\s*$", re.IGNORECASE)
-    try:
-        if os.path.exists(relay_file):
-            with open(relay_file, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    if line_re.match(line.strip()):
-                        existing_matches = True
-                        break
-    except Exception as e:
-        logger.error(f"Failed reading relay file {relay_file}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to read relay domains file")
+    async with _index_lock:
+        return await asyncio.to_thread(_append_new_domains, relay_file, requested)
 
-    if existing_matches:
-        raise HTTPException(status_code=409, detail="Domain already exists")
 
-    content = f"relay-domain *.{domain_raw}\n"
+def _append_new_domains(relay_file: str, requested: List[str]) -> Tuple[List[str], List[str]]:
+    """Duplicate check, append and meta update under the cross-process relay write lock."""
+    with _relay_write_lock(relay_file):
+        # Duplicate check against the in-memory index (reloaded only if the file changed)
+        try:
+            domains = load_domain_index(relay_file)
+        except Exception as e:
+            logger.error(f"Failed reading relay file {relay_file}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to read relay domains file")
+
+        added = [d for d in requested if d not in domains]
+        skipped = [d for d in requested if d in domains]
+        if not added:
+            return added, skipped
+
+        try:
+            _append_relay_lines(relay_file, added)
+        except Exception as e:
+            logger.error(f"Failed to append to relay file {relay_file}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to write relay domains file")
+        domains.update(dict.fromkeys(added))
+        _mark_index_synced(relay_file)
+        logger.info(f"Appended relay domain(s): {', '.join(added)} -> {relay_file}")
 
-    try:
-        # If the file exists and doesn't end with a newline, insert one before appending
-        needs_leading_newline = False
-        if os.path.exists(relay_file) and os.path.getsize(relay_file) > 0:
-            try:
-                with open(relay_file, "rb") as rf:
-                    rf.seek(-1, os.SEEK_END)
-                    last_byte = rf.read(1)
-                if last_byte != b"\n":
-                    needs_leading_newline = True
-            except Exception:
-                # If we fail to inspect last byte, just append normally
-                needs_leading_newline = False
-
-        with open(relay_file, "a", encoding="utf-8", newline="") as f:
-            if needs_leading_newline:
-                f.write("\n")
-            f.write(content)
-        logger.info(f"Appended relay domain: {domain_raw} -> {relay_file}")
         # Update meta file with added_at timestamp
         try:
-            _update_meta_added(relay_file, domain_raw)
+            _update_meta_added(relay_file, *added)
         except Exception as me:
-            logger.warning(f"Failed to update meta for domain {domain_raw}: {me}")
-        return {"message": "Domain added", "domain": domain_raw}
-    except Exception as e:
-        logger.error(f"Failed to append to relay file {relay_file}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to write relay domains file")
+            logger.warning(f"Failed to update meta for domain(s) {', '.join(added)}: {me}")
+    return added, skipped
+
+
+@router.post("/domains", status_code=201)
+async def add_domain(body: AddDomainRequest) -> Dict[str, str]:
+    # Already stripped, lower-cased and validated by DomainName
+    added, _ = await _add_relay_domains([body.domain])
+    if not added:
+        raise HTTPException(status_code=409, detail="Domain already exists")
+    return {"message": "Domain added", "domain": body.domain}
+
+
+class BulkAddDomainsRequest(BaseModel):
+    domains: List[DomainName]
+
+
+@router.post("/domains/bulk", status_code=201)
+async def bulk_add_domains(body: BulkAddDomainsRequest) -> Dict[str, List[str]]:
+    """Add many domains at once: one append, one fsync and one meta write for the whole batch."""
+    requested = list(dict.fromkeys(body.domains))
+    if not requested:
+        raise HTTPException(status_code=400, detail="At least one domain is required")
+    added, skipped = await _add_relay_domains(requested)
+    return {"added": added, "skipped": skipped}
+
+
+def _probe(path: str) -> Optional[os.stat_result]:
+    """Single stat() standing in for exists/isdir/getsize checks; None if the path is missing."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _ensure_relay_dir(relay_dir: str) -> None:
+    if relay_dir and not dir_exists_cached(relay_dir):
+        if settings.DEBUG:
+            os.makedirs(relay_dir, exist_ok=True)
+        else:
+            raise HTTPException(status_code=500, detail=f"Relay domains directory not found: {relay_dir}")
+
+
+def _append_relay_lines(relay_file: str, domains: List[str]) -> None:
+    """Append one relay line per domain with a single write and fsync."""
+    content = b"".join(_relay_line_bytes(d) for d in domains)
+    with open(relay_file, "ab+") as f:
+        # If the file doesn't end with a newline, insert one before appending
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                content = b"\n" + content
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Parsed meta files keyed by path, tagged with the (mtime_ns, size) they were read at
+_META_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict[str, str]]]] = {}
 
 
 def _get_meta_path(relay_file: str) -> str:
@@ -128,18 +303,26 @@ def _get_meta_path(relay_file: str) -> str:
 
 def _load_meta(relay_file: str) -> Dict[str, Dict[str, str]]:
     path = _get_meta_path(relay_file)
-    logger.info(f"[_load_meta] Meta path: {path}")
-    if not os.path.exists(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
         logger.info(f"[_load_meta] Meta file does not exist, returning empty dict")
         return {}
+    except Exception as e:
+        logger.error(f"[_load_meta] Error checking meta file: {e}")
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _META_CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return dict(cached[1])
     try:
-        import json
-        logger.info(f"[_load_meta] Reading meta file...")
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            data = json.load(f)
+        logger.info(f"[_load_meta] Reading meta file {path}...")
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
             if isinstance(data, dict):
                 logger.info(f"[_load_meta] Loaded meta data with {len(data)} entries")
-                return data
+                _META_CACHE[path] = (stamp, data)
+                return dict(data)
             logger.warning(f"[_load_meta] Meta data is not a dict: {type(data)}")
             return {}
     except Exception as e:
@@ -147,72 +330,130 @@ def _load_meta(relay_file: str) -> Dict[str, Dict[str, str]]:
         return {}
 
 
+# Meta loads currently running, keyed by meta path, so concurrent readers share one parse
+_meta_inflight: Dict[str, "asyncio.Future[Dict[str, Dict[str, str]]]"] = {}
+
+
+async def _load_meta_async(relay_file: str) -> Dict[str, Dict[str, str]]:
+    """Single-flight wrapper around _load_meta for request handlers.
+
+    The first caller starts the load in a worker thread; callers arriving before it finishes
+    await the same future instead of stat-ing and parsing the meta file again.
+    """
+    path = _get_meta_path(relay_file)
+    fut = _meta_inflight.get(path)
+    if fut is None:
+        fut = asyncio.ensure_future(asyncio.to_thread(_load_meta, relay_file))
+        _meta_inflight[path] = fut
+        fut.add_done_callback(lambda f: _meta_inflight.pop(path, None) if _meta_inflight.get(path) is f else None)
+    # shield: a cancelled request must not cancel the load other callers are waiting on
+    return dict(await asyncio.shield(fut))
+
+
 def _save_meta(relay_file: str, meta: Dict[str, Dict[str, str]]) -> None:
     path = _get_meta_path(relay_file)
     try:
-        import json
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(meta, f, indent=2, ensure_ascii=False)
+        _atomic_write(path, orjson.dumps(meta, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        st = os.stat(path)
+        _META_CACHE[path] = ((st.st_mtime_ns, st.st_size), dict(meta))
     except Exception as e:
+        _META_CACHE.pop(path, None)
         logger.warning(f"Failed saving meta file {path}: {e}")
 
 
-def _update_meta_added(relay_file: str, domain: str) -> None:
+def _update_meta_added(relay_file: str, *domains: str) -> None:
     from datetime import datetime, timezone
     meta = _load_meta(relay_file)
-    meta[domain] = meta.get(domain, {})
-    meta[domain]["added_at"] = datetime.now(timezone.utc).isoformat()
+    added_at = datetime.now(timezone.utc).isoformat()
+    for domain in domains:
+        meta[domain] = {**meta.get(domain, {}), "added_at": added_at}
     _save_meta(relay_file, meta)
 
 
 def _read_domains(relay_file: str) -> list[str]:
     domains: list[str] = []
     logger.info(f"[_read_domains] Starting with file: {relay_file}")
-    
-    # More robust pattern that works even if multiple entries are concatenated without newlines
-    pattern = re.compile(r"relay-domain\s+\*\.([A-Za-z0-9.-]+)", re.IGNORECASE)
-    
+
     if not os.path.exists(relay_file):
         logger.info(f"[_read_domains] File does not exist: {relay_file}")
         return domains
-        
-    try:
-        logger.info(f"[_read_domains] Opening file for reading...")
-        with open(relay_file, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-        logger.info(f"[_read_domains] Read {len(content)} characters")
-        
-        matches = list(pattern.finditer(content))
-        logger.info(f"[_read_domains] Found {len(matches)} regex matches")
-        
-        for m in matches:
-            domain = m.group(1).lower()
-            domains.append(domain)
-            logger.info(f"[_read_domains] Added domain: {domain}")
-            
-    except Exception as e:
-        logger.error(f"[_read_domains] Failed reading relay file {relay_file}: {e}", exc_info=True)
-        # Tolerate read errors by returning an empty list so the UI can load
-        return domains
-        
-    logger.info(f"[_read_domains] Returning {len(domains)} domains: {domains}")
+
+    prefix_len = len(RELAY_LINE_PREFIX)
+    with open(relay_file, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            s = line.strip()
+            if s.startswith(RELAY_LINE_PREFIX):
+                d = s[prefix_len:].strip().lower()
+                if _is_valid_domain(d):
+                    domains.append(d)
+                    continue
+            elif "relay-domain" not in s.lower():
+                continue
+            # Malformed line (odd spacing/case, or entries concatenated without newlines)
+            for m in RELAY_ENTRY_PATTERN.finditer(s):
+                domains.append(m.group(1).lower())
+
+    logger.info(f"[_read_domains] Returning {len(domains)} domains")
     return domains
 
 
+# In-memory view of the relay file: insertion-ordered set of domains, plus the
+# (mtime_ns, size) of the file it was built from so outside edits trigger a reload
+_domain_index: Dict[str, None] = {}
+_domain_index_stamp: Optional[Tuple[int, int]] = None
+# Orders relay file mutations within this process; _relay_write_lock covers other workers
+_index_lock = asyncio.Lock()
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    st = _probe(path)
+    return (st.st_mtime_ns, st.st_size) if st is not None else None
+
+
+def load_domain_index(relay_file: Optional[str] = None) -> Dict[str, None]:
+    """Return the in-memory relay domain index, rebuilding it if the relay file changed on disk."""
+    global _domain_index_stamp
+    relay_file = relay_file or settings.RELAYDOMAINS_PATH
+    stamp = _file_stamp(relay_file)
+    if stamp is not None and stamp == _domain_index_stamp:
+        return _domain_index
+    domains = _read_domains(relay_file) if stamp is not None else []
+    _domain_index.clear()
+    _domain_index.update(dict.fromkeys(domains))
+    _domain_index_stamp = stamp
+    return _domain_index
+
+
+def _mark_index_synced(relay_file: str) -> None:
+    """Record that the index reflects the relay file as just written by us."""
+    global _domain_index_stamp
+    _domain_index_stamp = _file_stamp(relay_file)
+
+
+# Serializer for the list_domains payload, built once instead of per request
+_DOMAINS_ADAPTER = TypeAdapter(Dict[str, Any])
+
+
 @router.get("/domains")
-async def list_domains() -> Dict:
+async def list_domains() -> Response:
     try:
         relay_file = settings.RELAYDOMAINS_PATH
         logger.info(f"[list_domains] Starting with relay_file: {relay_file}")
         
         items: list[Dict[str, str]] = []
         
-        logger.info(f"[list_domains] Calling _read_domains...")
-        domains = _read_domains(relay_file)
-        logger.info(f"[list_domains] Found {len(domains)} domains: {domains}")
+        async with _index_lock:
+            try:
+                domains = list(await asyncio.to_thread(load_domain_index, relay_file))
+            except Exception as e:
+                logger.error(f"[list_domains] Failed reading relay file {relay_file}: {e}", exc_info=True)
+                # Tolerate read errors by returning an empty list so the UI can load
+                domains = []
+            stamp = _domain_index_stamp
+        logger.info(f"[list_domains] Found {len(domains)} domains")
         
         logger.info(f"[list_domains] Loading meta...")
-        meta = _load_meta(relay_file)
+        meta = await _load_meta_async(relay_file)
         logger.info(f"[list_domains] Meta keys: {list(meta.keys())}")
         
         for d in domains:
@@ -222,16 +463,12 @@ async def list_domains() -> Dict:
         # Sort by added_at desc if available
         items.sort(key=lambda x: x.get("added_at") or "", reverse=True)
         
-        try:
-            exists = os.path.exists(relay_file)
-            size = os.path.getsize(relay_file) if exists else 0
-        except Exception as e:
-            logger.warning(f"[list_domains] Error checking file stats: {e}")
-            exists, size = False, 0
+        exists = stamp is not None
+        size = stamp[1] if stamp else 0
             
         result = {"domains": items, "relay_file": relay_file, "exists": exists, "size": size}
-        logger.info(f"[list_domains] Returning: {result}")
-        return result
+        logger.info(f"[list_domains] Returning {len(items)} domains")
+        return Response(_DOMAINS_ADAPTER.dump_json(result), media_type="application/json")
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -250,73 +487,86 @@ async def list_domains() -> Dict:
 
 
 @router.delete("/domains/{domain}")
-async def delete_domain(domain: str) -> Dict[str, str]:
-    domain = (domain or "").strip().lower()
-    if not domain or not DOMAIN_REGEX.match(domain):
-        raise HTTPException(status_code=400, detail="Invalid domain")
+async def delete_domain(domain: DomainName) -> Dict[str, str]:
     relay_file = settings.RELAYDOMAINS_PATH
-    if not os.path.exists(relay_file):
+    if await asyncio.to_thread(_probe, relay_file) is None:
         raise HTTPException(status_code=404, detail="Relay file not found")
-    # Robust rewrite from parsed domain list
-    try:
-        domains = _read_domains(relay_file)
+    async with _index_lock:
+        try:
+            await asyncio.to_thread(_delete_relay_domain, relay_file, domain)
+            return {"message": "Domain deleted", "domain": domain}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to delete domain {domain}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to update relay domains file")
+
+
+def _delete_relay_domain(relay_file: str, domain: str) -> None:
+    """Drop domain's relay line(s) and meta entry under the cross-process relay write lock."""
+    with _relay_write_lock(relay_file):
+        domains = load_domain_index(relay_file)
         if domain not in domains:
             raise HTTPException(status_code=404, detail="Domain not found")
-        new_domains = [d for d in domains if d != domain]
-        with open(relay_file, "w", encoding="utf-8", newline="") as f:
-            for d in new_domains:
-                f.write(f"relay-domain *.{d}\n")
+        # Drop the domain's line(s) in place, leaving the rest of the file untouched
+        if not _rewrite_relay_lines(relay_file, domain):
+            raise HTTPException(status_code=404, detail="Domain not found")
+        domains.pop(domain, None)
+        _mark_index_synced(relay_file)
         # Update meta
         meta = _load_meta(relay_file)
         if domain in meta:
             meta.pop(domain, None)
             _save_meta(relay_file, meta)
-        return {"message": "Domain deleted", "domain": domain}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to delete domain {domain}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update relay domains file")
+
+
+def _rename_relay_domain(relay_file: str, old_domain: str, new_domain: str) -> None:
+    """Swap old_domain's relay line for new_domain's and move its meta entry, in one worker hop.
+
+    Runs under the cross-process relay write lock. Meta is loaded (from cache when unchanged)
+    before touching the relay file, so both files are written back to back.
+    """
+    from datetime import datetime, timezone
+    with _relay_write_lock(relay_file):
+        domains = load_domain_index(relay_file)
+        if new_domain in domains:
+            raise HTTPException(status_code=409, detail="New domain already exists")
+        if old_domain not in domains:
+            raise HTTPException(status_code=404, detail="Old domain not found")
+        meta = _load_meta(relay_file)
+        if not _rewrite_relay_lines(relay_file, old_domain, _relay_line_bytes(new_domain)):
+            raise HTTPException(status_code=404, detail="Old domain not found")
+        # Rename in place so the index keeps the file order
+        renamed = [new_domain if d == old_domain else d for d in domains]
+        domains.clear()
+        domains.update(dict.fromkeys(renamed))
+        _mark_index_synced(relay_file)
+        # Keep the original added_at under the new key; stamp it now if there was none
+        entry = meta.pop(old_domain, None) or {"added_at": datetime.now(timezone.utc).isoformat()}
+        meta[new_domain] = {**meta.get(new_domain, {}), **entry}
+        _save_meta(relay_file, meta)
 
 
 class UpdateDomainRequest(BaseModel):
-    new_domain: str
+    new_domain: DomainName
 
 
 @router.put("/domains/{domain}")
-async def update_domain(domain: str, body: UpdateDomainRequest) -> Dict[str, str]:
-    old_domain = (domain or "").strip().lower()
-    new_domain = (body.new_domain or "").strip().lower()
-    if not old_domain or not DOMAIN_REGEX.match(old_domain):
-        raise HTTPException(status_code=400, detail="Invalid old domain")
-    if not new_domain or not DOMAIN_REGEX.match(new_domain):
-        raise HTTPException(status_code=400, detail="Invalid new domain")
+async def update_domain(domain: DomainName, body: UpdateDomainRequest) -> Dict[str, str]:
+    old_domain = domain
+    new_domain = body.new_domain
     if old_domain == new_domain:
         return {"message": "No changes", "domain": new_domain}
 
     relay_file = settings.RELAYDOMAINS_PATH
-    if not os.path.exists(relay_file):
+    if await asyncio.to_thread(_probe, relay_file) is None:
         raise HTTPException(status_code=404, detail="Relay file not found")
-    try:
-        domains = _read_domains(relay_file)
-        if new_domain in domains and new_domain != old_domain:
-            raise HTTPException(status_code=409, detail="New domain already exists")
-        if old_domain not in domains:
-            raise HTTPException(status_code=404, detail="Old domain not found")
-        new_domains = [new_domain if d == old_domain else d for d in domains]
-        with open(relay_file, "w", encoding="utf-8", newline="") as f:
-            for d in new_domains:
-                f.write(f"relay-domain *.{d}\n")
-        # Update meta: move added_at under new key
-        meta = _load_meta(relay_file)
-        if old_domain in meta:
-            meta[new_domain] = meta.pop(old_domain)
-            _save_meta(relay_file, meta)
-        else:
-            _update_meta_added(relay_file, new_domain)
-        return {"message": "Domain updated", "domain": new_domain}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to update domain {old_domain} -> {new_domain}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update relay domains file")
+    async with _index_lock:
+        try:
+            await asyncio.to_thread(_rename_relay_domain, relay_file, old_domain, new_domain)
+            return {"message": "Domain updated", "domain": new_domain}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to update domain {old_domain} -> {new_domain}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to update relay domains file")
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, List
+from functools import lru_cache
 from datetime import datetime
-import os
-import tempfile
+import asyncio
 import logging
 
 from app.models.email_models import (
@@ -18,7 +18,8 @@ from app.security.auth import get_current_user
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/emails", tags=["emails"], dependencies=[Depends(get_current_user)])
 
-# Dependency to get email service
+# Dependency to get email service; one shared instance so its file list cache outlives a request
+@lru_cache(maxsize=1)
 def get_email_service() -> EmailService:
     return EmailService()
 
@@ -30,7 +31,7 @@ async def list_emails(
 ):
     """Get paginated list of emails"""
     try:
-        emails, total_count = email_service.get_emails_summary(page, page_size)
+        emails, total_count = await email_service.get_emails_summary(page, page_size)
         total_pages = (total_count + page_size - 1) // page_size
         
         return EmailListResponse(
@@ -53,7 +54,8 @@ async def search_emails(
     try:
         logger.info(f"[search_emails] Received search request: {search_request.dict()}")
         
-        emails, total_count = email_service.search_emails(search_request)
+        # Blocking scan/parse work runs off the event loop
+        emails, total_count = await asyncio.to_thread(email_service.search_emails, search_request)
         total_pages = (total_count + search_request.page_size - 1) // search_request.page_size
         
         response = EmailListResponse(
@@ -100,7 +102,6 @@ async def get_email_detail(
 @router.post("/download")
 async def download_emails(
     download_request: DownloadRequest,
-    background_tasks: BackgroundTasks,
     email_service: EmailService = Depends(get_email_service)
 ):
     """Download selected emails in specified format"""
@@ -111,14 +112,10 @@ async def download_emails(
         # If format is ORIGINAL, zip and return raw .msg files without parsing
         if download_request.format == EmailFormat.ORIGINAL:
             # Resolve full paths for requested filenames
-            file_paths: list[str] = []
-            for name in download_request.filenames:
-                full = email_service._find_email_file(name)
-                if full:
-                    file_paths.append(full)
+            file_paths = email_service._find_email_files(download_request.filenames)
             if not file_paths:
                 raise HTTPException(status_code=404, detail="No emails found for download")
-            temp_file_path = FileService.create_original_zip(file_paths)
+            content = FileService.stream_original_zip(file_paths)
             media_type = "application/zip"
             filename = "emails_original.zip"
         else:
@@ -132,23 +129,20 @@ async def download_emails(
             if not emails_data:
                 raise HTTPException(status_code=404, detail="No emails found for download")
             
-            # Create download file
+            # Stream the export as it is serialized
             if download_request.format == EmailFormat.JSON:
-                temp_file_path = FileService.create_json_download(emails_data)
+                content = FileService.stream_json_download(emails_data)
                 media_type = "application/json"
                 filename = "emails_export.json"
             else:
-                temp_file_path = FileService.create_text_download(emails_data)
+                content = FileService.stream_text_download(emails_data)
                 media_type = "text/plain"
                 filename = "emails_export.txt"
         
-        # Schedule cleanup of temporary file
-        background_tasks.add_task(cleanup_temp_file, temp_file_path)
-        
-        return FileResponse(
-            path=temp_file_path,
+        return StreamingResponse(
+            content,
             media_type=media_type,
-            filename=filename
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
     except HTTPException:
         raise
@@ -162,30 +156,8 @@ async def get_email_stats(
 ):
     """Get email statistics summary"""
     try:
-        msg_files = email_service.get_email_files()
-        total_count = len(msg_files)
-        
-        # Calculate basic stats
-        total_size = 0
-        emails_with_attachments = 0
-        
-        for file_path in msg_files[:100]:  # Sample first 100 for performance
-            try:
-                file_size = os.path.getsize(file_path)
-                total_size += file_size
-                
-                summary = email_service.msg_parser.get_msg_summary(file_path)
-                if summary and summary.get('has_attachments'):
-                    emails_with_attachments += 1
-            except Exception:
-                continue
-        
-        return {
-            "total_emails": total_count,
-            "total_size_bytes": total_size,
-            "emails_with_attachments": emails_with_attachments,
-            "email_folder": settings.EMAIL_FOLDER_PATH
-        }
+        stats = await asyncio.to_thread(email_service.get_email_stats)
+        return {**stats, "email_folder": settings.EMAIL_FOLDER_PATH}
     except Exception as e:
         logger.error(f"Error getting email stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -217,11 +189,3 @@ async def test_search_endpoint(
             "error": str(e),
             "email_folder": settings.EMAIL_FOLDER_PATH
         }
-
-def cleanup_temp_file(file_path: str):
-    """Background task to cleanup temporary files"""
-    try:
-        if os.path.exists(file_path):
-            os.unlink(file_path)
-    except Exception as e:
-        logger.error(f"Error cleaning up temp file {file_path}: {str(e)}")
@@ -1,5 +1,11 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+import hashlib
+import hmac
+import threading
+import time
+
+from cachetools import TLRUCache, TTLCache
 
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
@@ -12,8 +18,19 @@ from app.config import settings
 # OAuth2 scheme (we'll use Bearer token in Authorization header)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
-# Password hashing context (optional; if AUTH_PASSWORD is plaintext we still work)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (optional; if AUTH_PASSWORD is plaintext we still work).
+# Built on first bcrypt check so plaintext setups never load/probe the bcrypt backend.
+_pwd_context: Optional[CryptContext] = None
+_pwd_context_lock = threading.Lock()
+
+
+def _get_pwd_context() -> CryptContext:
+    global _pwd_context
+    if _pwd_context is None:
+        with _pwd_context_lock:
+            if _pwd_context is None:
+                _pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto")
+    return _pwd_context
 
 # Built-in accounts: admin and normal user
 ADMIN_USERNAME = settings.AUTH_USERNAME
@@ -26,6 +43,66 @@ ADMIN_PASSWORD_BCRYPT = os.environ.get("AUTH_PASSWORD_BCRYPT")
 USER_PASSWORD_BCRYPT = os.environ.get("AUTH_USER_PASSWORD_BCRYPT")
 
 
+# Decode arguments built once rather than per request
+_JWT_KEY = settings.JWT_SECRET_KEY
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+
+# Successfully validated tokens, keyed by sha256(token) so raw tokens are never kept in memory.
+# Entries live at most JWT_CACHE_TTL seconds and never past the token's own exp claim.
+JWT_CACHE_TTL = 60
+_jwt_cache: TLRUCache = TLRUCache(
+    maxsize=10000,
+    ttu=lambda _key, value, now: min(now + JWT_CACHE_TTL, value[2]),
+    timer=time.time,
+)
+_jwt_cache_lock = threading.Lock()
+
+
+def _decode_token(token: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return (username, role) from a token, skipping signature checks for recently validated ones.
+
+    Raises JWTError for invalid tokens; failures are never cached.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    with _jwt_cache_lock:
+        cached = _jwt_cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1]
+    payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
+    username = payload.get("sub")
+    role = payload.get("role")
+    exp = payload.get("exp")
+    if username is not None and isinstance(exp, (int, float)):
+        with _jwt_cache_lock:
+            _jwt_cache[key] = (username, role, exp)
+    return username, role
+
+
+# Recent successful bcrypt verifications keyed by (username, sha256(password)). Failures are
+# never cached, so every wrong guess still pays the full bcrypt cost.
+_pw_cache: TTLCache = TTLCache(maxsize=64, ttl=300)
+_pw_cache_lock = threading.Lock()
+
+
+def _verify_bcrypt(username: str, plain_password: str, hashed: str) -> bool:
+    key = (username, hashlib.sha256(plain_password.encode()).digest())
+    with _pw_cache_lock:
+        if _pw_cache.get(key):
+            return True
+    try:
+        ok = _get_pwd_context().verify(plain_password, hashed)
+    except Exception:
+        return False
+    if ok:
+        with _pw_cache_lock:
+            _pw_cache[key] = True
+    return ok
+
+
+def _plaintext_equals(plain_password: str, expected: str) -> bool:
+    return hmac.compare_digest(plain_password.encode(), expected.encode())
+
+
 def verify_password(username: str, plain_password: str) -> bool:
     """Verify provided password for the given username.
 
@@ -35,19 +112,13 @@ def verify_password(username: str, plain_password: str) -> bool:
     # Admin account
     if username == ADMIN_USERNAME:
         if ADMIN_PASSWORD_BCRYPT:
-            try:
-                return pwd_context.verify(plain_password, ADMIN_PASSWORD_BCRYPT)
-            except Exception:
-                return False
-        return plain_password == ADMIN_PASSWORD
+            return _verify_bcrypt(username, plain_password, ADMIN_PASSWORD_BCRYPT)
+        return _plaintext_equals(plain_password, ADMIN_PASSWORD)
     # Normal user account
     if username == USER_USERNAME:
         if USER_PASSWORD_BCRYPT:
-            try:
-                return pwd_context.verify(plain_password, USER_PASSWORD_BCRYPT)
-            except Exception:
-                return False
-        return plain_password == USER_PASSWORD
+            return _verify_bcrypt(username, plain_password, USER_PASSWORD_BCRYPT)
+        return _plaintext_equals(plain_password, USER_PASSWORD)
     return False
 
 
@@ -55,7 +126,7 @@ def create_access_token(data: Dict, expires_minutes: Optional[int] = None) -> st
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes or settings.JWT_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
@@ -66,7 +137,10 @@ def get_current_user(request: Request, token: Optional[str] = Depends(oauth2_sch
         headers={"WWW-Authenticate": "Bearer"},
     )
     cookie_token = request.cookies.get("access_token")
-    candidates = [t for t in [cookie_token, token] if t]
+    # The cookie usually mirrors the Authorization header; decode an identical token only once
+    candidates = [t for t in (cookie_token, token) if t]
+    if len(candidates) == 2 and candidates[0] == candidates[1]:
+        candidates.pop()
     if not candidates:
         raise credentials_exception
     last_error: Optional[Exception] = None
@@ -74,9 +148,7 @@ def get_current_user(request: Request, token: Optional[str] = Depends(oauth2_sch
     role: Optional[str] = None
     for candidate in candidates:
         try:
-            payload = jwt.decode(candidate, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-            username = payload.get("sub")
-            role = payload.get("role")
+            username, role = _decode_token(candidate)
             if username is None:
                 continue
             # successful decode
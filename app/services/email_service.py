@@ -1,44 +1,265 @@
 import os
+import re
+import asyncio
 import json
-from typing import List, Optional, Dict, Any, Tuple
+import mmap
+from typing import Callable, List, NamedTuple, Optional, Dict, Any, Tuple
 from datetime import datetime
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
+from cachetools import LRUCache
+
 from app.config import settings
-from app.utils.msg_parser import MSGParser
+from app.utils.msg_parser import MSGParser, OLE_MAGIC
+from app.services.summary_cache import SummaryCache
 from app.models.email_models import EmailSummary, EmailDetail, EmailSearchRequest
 
 logger = logging.getLogger(__name__)
 
+# Below this many files the process round trip costs more than parsing inline
+PARSE_POOL_MIN_FILES = 8
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Lazily start the shared parser process pool (None when PARSE_WORKERS <= 1)"""
+    global _parse_pool
+    if settings.PARSE_WORKERS <= 1:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # Started from a request's worker thread, so don't fork a process holding live
+            # event loop, thread pool and sqlite/logging locks; forkserver children start clean
+            # (Windows has no forkserver and always spawns)
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=settings.PARSE_WORKERS,
+                mp_context=multiprocessing.get_context(method),
+            )
+        return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(cancel_futures=True)
+            _parse_pool = None
+
+
+def _retire_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Stop handing out a broken pool; the next caller starts a fresh one.
+
+    Other requests may still be iterating the old pool, so its futures are not cancelled.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+
+def parse_summaries(file_paths: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """MSGParser.get_msg_summary for many files, fanned out over the parser process pool.
+
+    Results keep the input order. Falls back to parsing in-process for small batches or if
+    the pool is unavailable.
+    """
+    pool = _get_parse_pool() if len(file_paths) >= PARSE_POOL_MIN_FILES else None
+    if pool is not None:
+        try:
+            chunksize = max(1, len(file_paths) // (settings.PARSE_WORKERS * 4))
+            return list(pool.map(MSGParser.get_msg_summary, file_paths, chunksize=chunksize))
+        except BrokenProcessPool as e:
+            logger.warning(f"Parser pool failed, parsing in-process instead: {str(e)}")
+            _retire_parse_pool(pool)
+    return [MSGParser.get_msg_summary(file_path) for file_path in file_paths]
+
+
+# Listing requests allowed to build summaries in worker threads at the same time
+PARSE_CONCURRENCY = (os.cpu_count() or 1) * 2
+
+# Validated EmailSummary models kept in memory per service
+SUMMARY_MODEL_CACHE_SIZE = 20_000
+
+# Queries made of plain words/addresses: such text is stored verbatim in an Outlook file, while
+# characters like "<" or ";" may only appear in the parser's composed "Name <addr>; ..." strings
+_RAW_PREFILTER_QUERY = re.compile(r"[A-Za-z0-9._@+-]+(?: [A-Za-z0-9._@+-]+)*")
+
+# Start of an RFC 2047 encoded-word ("=?charset?B?" / "=?charset?Q?"), as 8-bit or UTF-16LE text
+_RAW_ENCODED_WORD = re.compile(rb"=\?[!->@-~]{1,40}\?[BbQq]\?|=\x00\?\x00(?:[!->@-~]\x00){1,40}\?\x00[BbQq]\x00\?\x00")
+
+
+def compile_raw_query(query: Optional[str]) -> Optional["re.Pattern[bytes]"]:
+    """Case-insensitive bytes pattern finding query as 8-bit or UTF-16LE text in a raw file.
+
+    Returns None for queries the raw prefilter can't answer reliably (non-ASCII, punctuation).
+    """
+    if not query or not _RAW_PREFILTER_QUERY.fullmatch(query):
+        return None
+    raw = query.encode("ascii")
+    utf16 = b"\x00".join(re.escape(raw[i:i + 1]) for i in range(len(raw)))
+    return re.compile(re.escape(raw) + b"|" + utf16, re.IGNORECASE)
+
+
+def raw_file_may_match(file_path: str, pattern: "re.Pattern[bytes]") -> bool:
+    """False only if file_path is an Outlook file whose raw bytes cannot contain the query.
+
+    RFC 2822 files are always kept: their headers may be MIME encoded-words. So are Outlook
+    files holding an encoded-word (in 8-bit or UTF-16LE form), e.g. a From or To taken from
+    the transport headers, since the decoded text can match without appearing raw.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if f.read(len(OLE_MAGIC)) != OLE_MAGIC:
+                return True
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return pattern.search(mm) is not None or _RAW_ENCODED_WORD.search(mm) is not None
+    except (OSError, ValueError):
+        return True
+
+
+class _CompiledSearch(NamedTuple):
+    """Search criteria normalized once per search instead of once per file"""
+    query: Optional[str]
+    subject: Optional[str]
+    sender: Optional[str]
+    date_from: Optional[datetime]
+    date_to: Optional[datetime]
+    # date bounds as epoch seconds for the file mtime prefilter
+    from_ts: Optional[float]
+    to_ts: Optional[float]
+    
+    @classmethod
+    def from_request(cls, search_request: EmailSearchRequest) -> "_CompiledSearch":
+        date_from, date_to = search_request.date_from, search_request.date_to
+        return cls(
+            query=search_request.query.lower() if search_request.query else None,
+            subject=search_request.subject.lower() if search_request.subject else None,
+            sender=search_request.sender.lower() if search_request.sender else None,
+            date_from=date_from,
+            date_to=date_to,
+            # Naive datetimes are taken as local time, like the mtimes they're compared to
+            from_ts=date_from.timestamp() if date_from else None,
+            to_ts=date_to.timestamp() if date_to else None,
+        )
+
+
+def _attachments_as_dicts(email_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the parser's Attachment tuples into dicts for models and exports, in place"""
+    attachments = email_data.get('attachments')
+    if attachments:
+        email_data['attachments'] = [att._asdict() for att in attachments]
+    return email_data
+
+
+def _stat_cached(file_path: str, stats: Dict[str, os.stat_result]) -> Optional[os.stat_result]:
+    """os.stat through a per-request dict so each file is stat-ed at most once; None if missing"""
+    st = stats.get(file_path)
+    if st is None:
+        try:
+            st = stats[file_path] = os.stat(file_path)
+        except OSError:
+            return None
+    return st
+
+
 class EmailService:
     """Service class for handling email operations"""
     
     def __init__(self):
         self.email_folder = settings.EMAIL_FOLDER_PATH
         self.msg_parser = MSGParser()
+        # (mtime_ns of every scanned directory, sorted .msg paths) from the last folder walk
+        self._files_cache: Optional[Tuple[Dict[str, int], List[str]]] = None
+        # filename -> full path, rebuilt together with _files_cache
+        self._name_index: Dict[str, str] = {}
+        # Built EmailSummary models keyed by (path, mtime_ns, size); models are frozen so sharing is safe
+        self._summary_models: LRUCache = LRUCache(maxsize=SUMMARY_MODEL_CACHE_SIZE)
+        self._summary_models_lock = threading.Lock()
+        self.summary_cache: Optional[SummaryCache] = None
+        if settings.SUMMARY_CACHE_PATH:
+            try:
+                self.summary_cache = SummaryCache(settings.SUMMARY_CACHE_PATH)
+            except Exception as e:
+                logger.warning(f"Summary cache disabled, could not open {settings.SUMMARY_CACHE_PATH}: {str(e)}")
+        self._files_lock = threading.Lock()
+        self._parse_slots = asyncio.Semaphore(PARSE_CONCURRENCY)
     
     def get_email_files(self) -> List[str]:
-        """Get list of all .msg files in the email folder"""
+        """Get list of all .msg files in the email folder (sorted; callers must not mutate it)
+
+        The list is cached and reused as long as no scanned directory's mtime changed, so
+        repeat calls cost one stat per directory instead of a full tree walk.
+        """
         try:
-            email_folder = Path(self.email_folder)
-            if not email_folder.exists():
-                logger.warning(f"Email folder does not exist: {self.email_folder}")
-                return []
-            
-            msg_files = []
-            for file_path in email_folder.rglob("*.msg"):
-                msg_files.append(str(file_path))
-            
-            return sorted(msg_files)
+            with self._files_lock:
+                cached = self._files_cache
+                if cached is not None and self._dirs_unchanged(cached[0]):
+                    return cached[1]
+                if not os.path.isdir(self.email_folder):
+                    logger.warning(f"Email folder does not exist: {self.email_folder}")
+                    self._files_cache = None
+                    self._name_index = {}
+                    return []
+                # str(Path(...)) keeps paths spelled the way rglob produced them (e.g. no "./")
+                dir_mtimes, msg_files = self._scan_email_folder(str(Path(self.email_folder)))
+                msg_files.sort()
+                name_index: Dict[str, str] = {}
+                for path in msg_files:
+                    # On duplicate names keep the first in sorted order
+                    name_index.setdefault(os.path.basename(path), path)
+                self._files_cache = (dir_mtimes, msg_files)
+                self._name_index = name_index
+                # The folder changed: drop cached summaries of files that are gone
+                if self.summary_cache is not None:
+                    self.summary_cache.prune(msg_files)
+                return msg_files
         except Exception as e:
             logger.error(f"Error getting email files: {str(e)}")
             return []
     
-    def get_emails_summary(self, page: int = 1, page_size: int = 20) -> Tuple[List[EmailSummary], int]:
+    @staticmethod
+    def _scan_email_folder(root: str) -> Tuple[Dict[str, int], List[str]]:
+        """Walk root with os.scandir, returning directory mtimes and the .msg files found.
+
+        Symlinked directories are not descended into, matching Path.rglob.
+        """
+        dir_mtimes: Dict[str, int] = {root: os.stat(root).st_mtime_ns}
+        msg_files: List[str] = []
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        dir_mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                        stack.append(entry.path)
+                    elif os.path.normcase(entry.name).endswith(".msg") and entry.is_file():
+                        msg_files.append(entry.path)
+        return dir_mtimes, msg_files
+    
+    @staticmethod
+    def _dirs_unchanged(dir_mtimes: Dict[str, int]) -> bool:
+        """True if every directory from the last scan still exists with the same mtime"""
+        try:
+            return all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items())
+        except OSError:
+            return False
+    
+    async def get_emails_summary(self, page: int = 1, page_size: int = 20) -> Tuple[List[EmailSummary], int]:
         """
         Get a paginated list of email summaries with parsed content
         
+        The folder scan and parsing run in a worker thread so the event loop keeps serving
+        other requests; a semaphore bounds how many listings do so at once.
+        
         Args:
             page: Page number (1-based)
             page_size: Number of emails per page
@@ -46,6 +267,11 @@ class EmailService:
         Returns:
             Tuple of (email_summaries, total_count)
         """
+        async with self._parse_slots:
+            return await asyncio.to_thread(self._get_emails_page, page, page_size)
+    
+    def _get_emails_page(self, page: int, page_size: int) -> Tuple[List[EmailSummary], int]:
+        """Blocking implementation of get_emails_summary"""
         msg_files = self.get_email_files()
         total_count = len(msg_files)
         
@@ -54,18 +280,108 @@ class EmailService:
         end_idx = start_idx + page_size
         paginated_files = msg_files[start_idx:end_idx]
         
+        return self._build_summaries(paginated_files), total_count
+    
+    def _get_summaries(self, file_paths: List[str], prefilter: Optional[Callable[[str], bool]] = None, stats: Optional[Dict[str, os.stat_result]] = None) -> List[Optional[Dict[str, Any]]]:
+        """Parsed summaries for file_paths, served from the summary cache where still valid
+
+        Files that need parsing but fail prefilter are skipped and reported as None.
+        """
+        cache = self.summary_cache
+        stats = {} if stats is None else stats
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_paths)
+        
+        # One bulk query for every file that still exists, instead of a point read per file
+        cached: Dict[str, Dict[str, Any]] = {}
+        if cache is not None:
+            entries = []
+            for file_path in file_paths:
+                st = _stat_cached(file_path, stats)
+                if st is not None:
+                    entries.append((file_path, st.st_mtime_ns, st.st_size))
+            cached = cache.get_many(entries)
+        
+        misses: List[Tuple[int, str]] = []
+        for i, file_path in enumerate(file_paths):
+            summary_data = cached.get(file_path)
+            if summary_data is not None:
+                results[i] = summary_data
+            elif prefilter is None or prefilter(file_path):
+                misses.append((i, file_path))
+        
+        if misses:
+            parsed = parse_summaries([file_path for _, file_path in misses])
+            new_entries = []
+            for (i, file_path), summary_data in zip(misses, parsed):
+                results[i] = summary_data
+                st = stats.get(file_path)
+                # Failed parses are not cached so a fixed file gets picked up
+                if summary_data and st is not None:
+                    new_entries.append((file_path, st.st_mtime_ns, st.st_size, summary_data))
+            if cache is not None and new_entries:
+                cache.put_many(new_entries)
+        return results
+    
+    def get_email_stats(self, sample_size: int = 100) -> Dict[str, int]:
+        """Email count plus size and attachment totals over the first sample_size files (blocking)"""
+        msg_files = self.get_email_files()
+        sample = msg_files[:sample_size]
+        total_size = 0
+        emails_with_attachments = 0
+        for file_path, summary in zip(sample, self._get_summaries(sample)):
+            try:
+                total_size += os.path.getsize(file_path)
+            except OSError:
+                continue
+            if summary and summary.get('has_attachments'):
+                emails_with_attachments += 1
+        return {
+            "total_emails": len(msg_files),
+            "total_size_bytes": total_size,
+            "emails_with_attachments": emails_with_attachments,
+        }
+    
+    def _build_summaries(self, file_paths: List[str], parsed: Optional[Dict[str, Optional[Dict[str, Any]]]] = None, stats: Optional[Dict[str, os.stat_result]] = None) -> List[EmailSummary]:
+        """Turn files into EmailSummary models, parsing those not already in parsed
+
+        Models built from a successful parse are reused while the file's mtime and size are unchanged.
+        """
+        stats = {} if stats is None else stats
+        keys: Dict[str, Tuple[str, int, int]] = {}
+        models: Dict[str, EmailSummary] = {}
+        for file_path in file_paths:
+            st = _stat_cached(file_path, stats)
+            if st is None:
+                continue
+            key = keys[file_path] = (file_path, st.st_mtime_ns, st.st_size)
+            with self._summary_models_lock:
+                model = self._summary_models.get(key)
+            if model is not None:
+                models[file_path] = model
+        
+        parsed = parsed or {}
+        missing = [p for p in file_paths if p not in parsed and p not in models]
+        if missing:
+            parsed = {**parsed, **dict(zip(missing, self._get_summaries(missing, stats=stats)))}
+        
         email_summaries = []
-        for file_path in paginated_files:
+        for file_path in file_paths:
             try:
-                # Parse email content to get actual metadata
-                summary_data = self.msg_parser.get_msg_summary(file_path)
+                if file_path in models:
+                    email_summaries.append(models[file_path])
+                    continue
+                
+                summary_data = parsed.get(file_path)
                 
                 if summary_data:
                     email_summary = EmailSummary(**summary_data)
                     email_summaries.append(email_summary)
+                    if file_path in keys:
+                        with self._summary_models_lock:
+                            self._summary_models[keys[file_path]] = email_summary
                 else:
                     # Fallback to file metadata if parsing fails
-                    file_stats = os.stat(file_path)
+                    file_stats = stats.get(file_path) or os.stat(file_path)
                     filename = os.path.basename(file_path)
                     
                     fallback_data = {
@@ -86,7 +402,7 @@ class EmailService:
                 logger.error(f"Error processing email summary for {file_path}: {str(e)}")
                 continue
         
-        return email_summaries, total_count
+        return email_summaries
     
     def get_email_detail(self, filename: str) -> Optional[EmailDetail]:
         """
@@ -105,7 +421,7 @@ class EmailService:
             
             email_data = self.msg_parser.parse_msg_file(file_path)
             if email_data:
-                return EmailDetail(**email_data)
+                return EmailDetail(**_attachments_as_dicts(email_data))
             return None
         except Exception as e:
             logger.error(f"Error getting email detail for {filename}: {str(e)}")
@@ -137,22 +453,30 @@ class EmailService:
             if not any([search_request.query, search_request.sender, search_request.subject, 
                        search_request.date_from, search_request.date_to]):
                 logger.info("[search_emails] No search criteria, returning paginated results")
-                return self.get_emails_summary(search_request.page, search_request.page_size)
+                return self._get_emails_page(search_request.page, search_request.page_size)
             
-            matching_files = []
-            processed_count = 0
-            
-            for file_path in msg_files:
-                try:
-                    processed_count += 1
-                    if processed_count % 100 == 0:
-                        logger.info(f"[search_emails] Processed {processed_count}/{len(msg_files)} files")
-                    
-                    if self._matches_search_criteria(file_path, search_request):
-                        matching_files.append(file_path)
-                except Exception as e:
-                    logger.error(f"[search_emails] Error checking file {file_path}: {str(e)}")
-                    continue
+            # Cheap file mtime date check first, then parse the survivors in parallel
+            # One stat per file shared by the date check, summary cache and result page
+            stats: Dict[str, os.stat_result] = {}
+            criteria = _CompiledSearch.from_request(search_request)
+            candidates = [p for p in msg_files if self._passes_file_date(p, criteria.from_ts, criteria.to_ts, stats)]
+            parsed: Dict[str, Optional[Dict[str, Any]]] = {}
+            if any([search_request.query, search_request.sender, search_request.subject]):
+                # Outlook files whose raw bytes lack the query can't match it, so skip parsing them.
+                # Skipped files come back as None and the filename fallback then rejects them,
+                # hence files whose name contains the query are always kept.
+                prefilter = None
+                raw_query = compile_raw_query(search_request.query)
+                if raw_query is not None:
+                    query_lower = search_request.query.lower()
+                    prefilter = lambda p: query_lower in os.path.basename(p).lower() or raw_file_may_match(p, raw_query)
+                logger.info(f"[search_emails] Checking {len(candidates)} candidate files")
+                parsed = dict(zip(candidates, self._get_summaries(candidates, prefilter, stats)))
+                # Bound once: this loop runs for every candidate file
+                matches = self._matches_email_data
+                matching_files = [p for p in candidates if matches(p, parsed[p], criteria)]
+            else:
+                matching_files = candidates
             
             total_count = len(matching_files)
             logger.info(f"[search_emails] Found {total_count} matching files")
@@ -162,36 +486,8 @@ class EmailService:
             end_idx = start_idx + search_request.page_size
             paginated_files = matching_files[start_idx:end_idx]
             
-            email_summaries = []
-            for file_path in paginated_files:
-                try:
-                    # Parse email content to get actual metadata
-                    summary_data = self.msg_parser.get_msg_summary(file_path)
-                    
-                    if summary_data:
-                        email_summary = EmailSummary(**summary_data)
-                        email_summaries.append(email_summary)
-                    else:
-                        # Fallback to file metadata if parsing fails
-                        file_stats = os.stat(file_path)
-                        filename = os.path.basename(file_path)
-                        
-                        fallback_data = {
-                            'filename': filename,
-                            'subject': f"[Parse Error] {filename}",
-                            'sender': 'Unknown',
-                            'date': datetime.fromtimestamp(file_stats.st_mtime),
-                            'size': file_stats.st_size,
-                            'has_attachments': False,
-                            'attachment_count': 0,
-                            'recipients': []
-                        }
-                        
-                        email_summary = EmailSummary(**fallback_data)
-                        email_summaries.append(email_summary)
-                except Exception as e:
-                    logger.error(f"Error processing email summary for {file_path}: {str(e)}")
-                    continue
+            # Reuse the summaries parsed while matching
+            email_summaries = self._build_summaries(paginated_files, parsed, stats)
             
             logger.info(f"[search_emails] Returning {len(email_summaries)} email summaries")
             return email_summaries, total_count
@@ -199,68 +495,60 @@ class EmailService:
             logger.error(f"Error searching emails: {str(e)}", exc_info=True)
             return [], 0
     
-    def _matches_search_criteria(self, file_path: str, search_request: EmailSearchRequest) -> bool:
-        """Check if an email file matches the search criteria based on parsed email content"""
+    def _passes_file_date(self, file_path: str, from_ts: Optional[float], to_ts: Optional[float], stats: Optional[Dict[str, os.stat_result]] = None) -> bool:
+        """Quick date range check using file modification time (bounds as epoch seconds)"""
+        if from_ts is None and to_ts is None:
+            return True
+        st = _stat_cached(file_path, {} if stats is None else stats)
+        if st is None:
+            logger.error(f"Error checking search criteria for {file_path}: file not found")
+            return False
+        if from_ts is not None and st.st_mtime < from_ts:
+            return False
+        if to_ts is not None and st.st_mtime > to_ts:
+            return False
+        return True
+    
+    def _matches_email_data(self, file_path: str, email_data: Optional[Dict[str, Any]], criteria: _CompiledSearch) -> bool:
+        """Check parsed email content (from get_msg_summary) against the search criteria"""
         try:
-            # First check file-based criteria (faster)
-            file_stats = os.stat(file_path)
-            filename = os.path.basename(file_path)
-            file_date = datetime.fromtimestamp(file_stats.st_mtime)
-            
-            # Quick date range check using file modification time
-            if search_request.date_from and file_date < search_request.date_from:
-                return False
-            if search_request.date_to and file_date > search_request.date_to:
-                return False
-            
-            # If only date filtering is needed and file passes, return True
-            if not any([search_request.query, search_request.sender, search_request.subject]):
-                return True
-            
-            # Parse email content only if content-based searching is needed
-            email_data = self.msg_parser.get_msg_summary(file_path)
-            
             if not email_data:
                 # Fallback to filename-based searches if parsing fails
-                filename_lower = filename.lower()
-                if search_request.query and search_request.query.lower() not in filename_lower:
+                filename_lower = os.path.basename(file_path).lower()
+                if criteria.query and criteria.query not in filename_lower:
                     return False
-                if search_request.subject and search_request.subject.lower() not in filename_lower:
+                if criteria.subject and criteria.subject not in filename_lower:
                     return False
-                if search_request.sender:
+                if criteria.sender:
                     # Can't check sender from filename, so exclude
                     return False
                 return True
             
-            # Use parsed email data for more accurate searching
+            # More precise date range check with actual email date
             email_date = email_data.get('date')
-            subject = email_data.get('subject', '').lower()
-            sender = email_data.get('sender', '').lower()
-            recipients = email_data.get('recipients', [])
-            recipients_text = ' '.join(recipients).lower() if recipients else ''
+            if email_date:
+                if criteria.date_from and email_date < criteria.date_from:
+                    return False
+                if criteria.date_to and email_date > criteria.date_to:
+                    return False
             
-            # More precise date range check with actual email date
-            if search_request.date_from and email_date and email_date < search_request.date_from:
-                return False
-            if search_request.date_to and email_date and email_date > search_request.date_to:
-                return False
+            # Use parsed email data for more accurate searching; lower-case fields only when needed
+            subject = (email_data.get('subject') or '').lower() if criteria.query or criteria.subject else ''
+            sender = (email_data.get('sender') or '').lower() if criteria.query or criteria.sender else ''
             
             # Check query in subject, sender, and recipients
-            if search_request.query:
-                query_lower = search_request.query.lower()
-                if not any([
-                    query_lower in subject,
-                    query_lower in sender,
-                    query_lower in recipients_text
-                ]):
+            if criteria.query:
+                query = criteria.query
+                if not (query in subject or query in sender
+                        or any(query in r.lower() for r in email_data.get('recipients') or ())):
                     return False
             
             # Check specific subject search
-            if search_request.subject and search_request.subject.lower() not in subject:
+            if criteria.subject and criteria.subject not in subject:
                 return False
             
             # Check specific sender search
-            if search_request.sender and search_request.sender.lower() not in sender:
+            if criteria.sender and criteria.sender not in sender:
                 return False
             
             return True
@@ -271,15 +559,19 @@ class EmailService:
     def _find_email_file(self, filename: str) -> Optional[str]:
         """Find the full path of an email file by filename"""
         try:
-            email_folder = Path(self.email_folder)
-            for file_path in email_folder.rglob("*.msg"):
-                if file_path.name == filename:
-                    return str(file_path)
-            return None
+            # Refreshes the name index if the folder changed
+            self.get_email_files()
+            return self._name_index.get(filename)
         except Exception as e:
             logger.error(f"Error finding email file {filename}: {str(e)}")
             return None
     
+    def _find_email_files(self, filenames: List[str]) -> List[str]:
+        """Resolve many filenames with one file list validation; unknown names are skipped"""
+        self.get_email_files()
+        name_index = self._name_index
+        return [name_index[name] for name in filenames if name in name_index]
+    
     def get_emails_for_download(self, filenames: List[str], format_type: str, include_attachments: bool = False) -> List[Dict[str, Any]]:
         """
         Get email data for download in specified format
@@ -294,17 +586,18 @@ class EmailService:
         """
         try:
             emails_data = []
-            for filename in filenames:
-                file_path = self._find_email_file(filename)
-                if file_path:
-                    email_data = self.msg_parser.parse_msg_file(file_path)
-                    if email_data:
-                        if not include_attachments:
-                            # Remove attachment data but keep metadata
-                            if 'attachments' in email_data:
-                                for att in email_data['attachments']:
-                                    att.pop('data', None)
-                        emails_data.append(email_data)
+            # The text export has no use for html_body, so skip building it (and its inline images)
+            include_html = format_type != 'text'
+            for file_path in self._find_email_files(filenames):
+                email_data = self.msg_parser.parse_msg_file(file_path, include_html=include_html)
+                if email_data:
+                    _attachments_as_dicts(email_data)
+                    if not include_attachments:
+                        # Remove attachment data but keep metadata
+                        if 'attachments' in email_data:
+                            for att in email_data['attachments']:
+                                att.pop('data', None)
+                    emails_data.append(email_data)
             
             return emails_data
         except Exception as e:
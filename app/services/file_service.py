@@ -1,215 +1,219 @@
-import json
-import tempfile
+import os
 import zipfile
-from typing import List, Dict, Any
+from email.message import Message
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Any, Tuple
 from pathlib import Path
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Read size when copying original files into a streamed ZIP
+ZIP_READ_CHUNK = 1024 * 1024
+# Target size of the pieces a text export is streamed in
+TEXT_STREAM_CHUNK = 64 * 1024
+# Threads preparing entry payloads for ZIP exports
+ZIP_PAYLOAD_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback for values it can't encode natively, e.g. the Outlook header Message"""
+    if isinstance(obj, Message):
+        return dict(obj.items())
+    return str(obj)
+
+
+class _ZipStreamSink:
+    """Write-only, unseekable file object for zipfile that buffers output until drained.
+
+    zipfile falls back to data descriptors when it can't seek, so the archive can be sent
+    while it is being written.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
 class FileService:
     """Service class for handling file operations and downloads"""
     
     @staticmethod
-    def create_json_download(emails_data: List[Dict[str, Any]], filename: str = "emails.json") -> str:
+    def stream_json_download(emails_data: List[Dict[str, Any]]) -> Iterator[bytes]:
         """
-        Create a JSON file for download
+        Stream a JSON export, one email at a time
+        
+        The first email is serialized before this returns, so a failure surfaces while the
+        caller can still answer with an error instead of a truncated 200 response.
         
         Args:
             emails_data: List of email data dictionaries
-            filename: Name for the output file
             
         Returns:
-            Path to the created temporary file
+            Iterator over chunks of the UTF-8 encoded JSON document
         """
-        try:
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
-            
-            # Convert datetime objects to strings for JSON serialization
-            serializable_data = FileService._make_json_serializable(emails_data)
-            
-            # Write JSON data
-            json.dump({
-                'emails': serializable_data,
-                'total_count': len(serializable_data),
-                'export_timestamp': FileService._get_current_timestamp()
-            }, temp_file, indent=2, ensure_ascii=False)
-            
-            temp_file.close()
-            return temp_file.name
-        except Exception as e:
-            logger.error(f"Error creating JSON download: {str(e)}")
-            raise
+        first = FileService._dump_json(emails_data[0]) if emails_data else b""
+        return FileService._json_chunks(emails_data, first)
     
     @staticmethod
-    def create_text_download(emails_data: List[Dict[str, Any]], filename: str = "emails.txt") -> str:
+    def _json_chunks(emails_data: List[Dict[str, Any]], first: bytes) -> Iterator[bytes]:
+        yield b'{\n"emails": [\n' + first
+        for email in emails_data[1:]:
+            yield b",\n" + FileService._dump_json(email)
+        trailer = FileService._dump_json(
+            {'total_count': len(emails_data), 'export_timestamp': FileService._get_current_timestamp()}
+        )
+        # Splice the remaining keys in after the array: '{\n  "total_count"...' -> ',\n  "total_count"...'
+        yield b"\n],\n" + trailer[2:]
+    
+    @staticmethod
+    def _dump_json(data: Any) -> bytes:
+        # orjson serializes datetimes natively and emits UTF-8 bytes directly
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2)
+    
+    @staticmethod
+    def stream_text_download(emails_data: List[Dict[str, Any]]) -> Iterator[bytes]:
         """
-        Create a text file for download
+        Stream a plain text export, one email block at a time
         
         Args:
             emails_data: List of email data dictionaries
-            filename: Name for the output file
             
-        Returns:
-            Path to the created temporary file
+        Yields:
+            Chunks of the UTF-8 encoded text file
         """
-        try:
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8')
-            
-            # Write header
-            temp_file.write("EMAIL EXPORT\n")
-            temp_file.write("=" * 50 + "\n")
-            temp_file.write(f"Export Date: {FileService._get_current_timestamp()}\n")
-            temp_file.write(f"Total Emails: {len(emails_data)}\n")
-            temp_file.write("=" * 50 + "\n\n")
-            
-            # Write each email
-            for i, email in enumerate(emails_data, 1):
-                temp_file.write(f"EMAIL #{i}\n")
-                temp_file.write("-" * 30 + "\n")
-                temp_file.write(f"Filename: {email.get('filename', 'N/A')}\n")
-                temp_file.write(f"Subject: {email.get('subject', 'N/A')}\n")
-                temp_file.write(f"From: {email.get('sender', 'N/A')}\n")
-                temp_file.write(f"To: {', '.join(email.get('recipients', []))}\n")
-                temp_file.write(f"Date: {email.get('date', 'N/A')}\n")
-                
-                if email.get('cc'):
-                    temp_file.write(f"CC: {', '.join(email.get('cc', []))}\n")
-                
-                if email.get('bcc'):
-                    temp_file.write(f"BCC: {', '.join(email.get('bcc', []))}\n")
-                
-                temp_file.write(f"Size: {email.get('size', 0)} bytes\n")
-                
-                if email.get('attachments'):
-                    temp_file.write(f"Attachments: {len(email.get('attachments', []))}\n")
-                    for att in email.get('attachments', []):
-                        temp_file.write(f"  - {att.get('filename', 'Unknown')} ({att.get('size', 0)} bytes)\n")
-                
-                temp_file.write("\nBody:\n")
-                body = email.get('body', '')
-                if body:
-                    temp_file.write(body)
-                else:
-                    temp_file.write("No text body available")
-                
-                temp_file.write("\n\n" + "=" * 50 + "\n\n")
-            
-            temp_file.close()
-            return temp_file.name
-        except Exception as e:
-            logger.error(f"Error creating text download: {str(e)}")
-            raise
+        header = (
+            "EMAIL EXPORT\n"
+            + "=" * 50 + "\n"
+            + f"Export Date: {FileService._get_current_timestamp()}\n"
+            + f"Total Emails: {len(emails_data)}\n"
+            + "=" * 50 + "\n\n"
+        )
+        # Emails are encoded into one buffer and sent in ~64 KiB pieces rather than one
+        # small chunk per email
+        buf = bytearray(header.encode("utf-8"))
+        separator = ("\n\n" + "=" * 50 + "\n\n").encode("utf-8")
+        for i, email in enumerate(emails_data, 1):
+            buf += f"EMAIL #{i}\n{'-' * 30}\n{FileService._format_email_as_text(email)}".encode("utf-8")
+            buf += separator
+            if len(buf) >= TEXT_STREAM_CHUNK:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
     
     @staticmethod
-    def create_zip_download(emails_data: List[Dict[str, Any]], format_type: str = "json") -> str:
+    def stream_zip_download(emails_data: List[Dict[str, Any]], format_type: str = "json") -> Iterator[bytes]:
         """
-        Create a ZIP file containing multiple email files
+        Stream a ZIP file containing one JSON or text file per email
         
         Args:
             emails_data: List of email data dictionaries
             format_type: 'json' or 'text'
             
-        Returns:
-            Path to the created temporary ZIP file
+        Yields:
+            Chunks of the ZIP file
         """
-        try:
-            # Create temporary ZIP file
-            temp_zip = tempfile.NamedTemporaryFile(suffix='.zip', delete=False)
-            temp_zip.close()
-            
-            with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for email in emails_data:
-                    filename = email.get('filename', 'unknown.msg')
-                    base_name = Path(filename).stem
-                    
-                    if format_type == "json":
-                        # Create individual JSON file for each email
-                        email_json = json.dumps(
-                            FileService._make_json_serializable([email]),
-                            indent=2,
-                            ensure_ascii=False
-                        )
-                        zipf.writestr(f"{base_name}.json", email_json)
-                    else:
-                        # Create individual text file for each email
-                        email_text = FileService._format_email_as_text(email)
-                        zipf.writestr(f"{base_name}.txt", email_text)
-            
-            return temp_zip.name
-        except Exception as e:
-            logger.error(f"Error creating ZIP download: {str(e)}")
-            raise
+        sink = _ZipStreamSink()
+        # Entries are serialized on worker threads while the main thread deflates the previous
+        # ones (zlib releases the GIL); ZipFile itself is only touched from this thread
+        with ThreadPoolExecutor(max_workers=ZIP_PAYLOAD_WORKERS) as executor:
+            payloads = executor.map(lambda email: FileService._zip_entry(email, format_type), emails_data)
+            # Text/JSON compresses well even at the fastest level
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+                for arcname, payload in payloads:
+                    zipf.writestr(arcname, payload)
+                    yield sink.drain()
+        yield sink.drain()
+
+    @staticmethod
+    def _zip_entry(email: Dict[str, Any], format_type: str) -> Tuple[str, bytes]:
+        """Archive name and encoded content of one email in a ZIP export"""
+        base_name = Path(email.get('filename', 'unknown.msg')).stem
+        if format_type == "json":
+            # Create individual JSON file for each email
+            return f"{base_name}.json", FileService._dump_json([email])
+        # Create individual text file for each email
+        return f"{base_name}.txt", FileService._format_email_as_text(email).encode("utf-8")
 
     @staticmethod
-    def create_original_zip(file_paths: List[str]) -> str:
-        """Create a ZIP file containing the original .msg files without parsing.
+    def stream_original_zip(file_paths: List[str]) -> Iterator[bytes]:
+        """Stream a ZIP file containing the original .msg files without parsing.
+
+        Nothing is staged on disk: the archive is written to an in-memory sink that is drained
+        after every chunk, so memory stays around one read buffer.
 
         Args:
             file_paths: Full paths to the original .msg files to include
 
-        Returns:
-            Path to the created temporary ZIP file
+        Yields:
+            Chunks of the ZIP file
         """
-        try:
-            # Create temporary ZIP file
-            temp_zip = tempfile.NamedTemporaryFile(suffix='.zip', delete=False)
-            temp_zip.close()
-
-            with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for path in file_paths:
-                    p = Path(path)
-                    if p.exists() and p.is_file():
-                        # Store each file by its original filename
-                        zipf.write(str(p), arcname=p.name)
-            return temp_zip.name
-        except Exception as e:
-            logger.error(f"Error creating original files ZIP: {str(e)}")
-            raise
-    
-    @staticmethod
-    def _make_json_serializable(data: Any) -> Any:
-        """Convert data to JSON serializable format"""
-        if isinstance(data, dict):
-            return {key: FileService._make_json_serializable(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            return [FileService._make_json_serializable(item) for item in data]
-        elif hasattr(data, 'isoformat'):  # datetime objects
-            return data.isoformat()
-        else:
-            return data
+        sink = _ZipStreamSink()
+        buf = bytearray(ZIP_READ_CHUNK)
+        view = memoryview(buf)
+        # Stored, not deflated: .msg files are mostly already-compressed attachments
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED, allowZip64=True) as zipf:
+            for path in file_paths:
+                p = Path(path)
+                if not (p.exists() and p.is_file()):
+                    continue
+                # Store each file by its original filename
+                zinfo = zipfile.ZipInfo.from_file(str(p), arcname=p.name)
+                zinfo.compress_type = zipf.compression
+                with open(p, 'rb', buffering=0) as src, zipf.open(zinfo, 'w', force_zip64=zinfo.file_size > zipfile.ZIP64_LIMIT) as dst:
+                    # Reuse one buffer for every read; the sink copies what it keeps
+                    while True:
+                        n = src.readinto(buf)
+                        if not n:
+                            break
+                        dst.write(view[:n])
+                        yield sink.drain()
+                yield sink.drain()
+        yield sink.drain()
     
     @staticmethod
     def _format_email_as_text(email: Dict[str, Any]) -> str:
         """Format a single email as text"""
-        text_parts = []
-        text_parts.append(f"Filename: {email.get('filename', 'N/A')}")
-        text_parts.append(f"Subject: {email.get('subject', 'N/A')}")
-        text_parts.append(f"From: {email.get('sender', 'N/A')}")
-        text_parts.append(f"To: {', '.join(email.get('recipients', []))}")
-        text_parts.append(f"Date: {email.get('date', 'N/A')}")
+        get = email.get
+        cc, bcc, attachments, body = get('cc'), get('bcc'), get('attachments'), get('body')
+        text_parts = [
+            f"Filename: {get('filename', 'N/A')}",
+            f"Subject: {get('subject', 'N/A')}",
+            f"From: {get('sender', 'N/A')}",
+            f"To: {', '.join(get('recipients') or [])}",
+            f"Date: {get('date', 'N/A')}",
+        ]
         
-        if email.get('cc'):
-            text_parts.append(f"CC: {', '.join(email.get('cc', []))}")
+        if cc:
+            text_parts.append(f"CC: {', '.join(cc)}")
         
-        if email.get('bcc'):
-            text_parts.append(f"BCC: {', '.join(email.get('bcc', []))}")
+        if bcc:
+            text_parts.append(f"BCC: {', '.join(bcc)}")
         
-        text_parts.append(f"Size: {email.get('size', 0)} bytes")
+        text_parts.append(f"Size: {get('size', 0)} bytes")
         
-        if email.get('attachments'):
-            text_parts.append(f"Attachments: {len(email.get('attachments', []))}")
-            for att in email.get('attachments', []):
-                text_parts.append(f"  - {att.get('filename', 'Unknown')} ({att.get('size', 0)} bytes)")
+        if attachments:
+            text_parts.append(f"Attachments: {len(attachments)}")
+            text_parts.extend(
+                f"  - {att.get('filename', 'Unknown')} ({att.get('size', 0)} bytes)" for att in attachments
+            )
         
         text_parts.append("\nBody:")
-        body = email.get('body', '')
-        if body:
-            text_parts.append(body)
-        else:
-            text_parts.append("No text body available")
+        text_parts.append(body if body else "No text body available")
         
         return "\n".join(text_parts)
     
@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Paths per "WHERE path IN (...)" query, below sqlite's bound parameter limit
+_LOOKUP_BATCH = 500
+
+class SummaryCache:
+    """Persistent cache of parsed email summaries in a single sqlite file
+
+    Entries are keyed by path and only returned while the file's (mtime_ns, size) still match
+    what was recorded, so edited or replaced emails are parsed again.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, json BLOB NOT NULL)"
+        )
+
+    def get_many(self, entries: Iterable[Tuple[str, int, int]]) -> Dict[str, Dict[str, Any]]:
+        """Cached summaries for the (path, mtime_ns, size) entries whose file is unchanged, by path"""
+        wanted = {path: (mtime_ns, size) for path, mtime_ns, size in entries}
+        paths = list(wanted)
+        rows: List[Tuple[str, int, int, bytes]] = []
+        try:
+            with self._lock:
+                for start in range(0, len(paths), _LOOKUP_BATCH):
+                    batch = paths[start:start + _LOOKUP_BATCH]
+                    rows.extend(self._conn.execute(
+                        f"SELECT path, mtime_ns, size, json FROM summaries WHERE path IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ))
+        except sqlite3.Error as e:
+            logger.warning(f"Summary cache bulk read failed: {str(e)}")
+            return {}
+        
+        found: Dict[str, Dict[str, Any]] = {}
+        for path, mtime_ns, size, data in rows:
+            if wanted.get(path) != (mtime_ns, size):
+                continue
+            try:
+                found[path] = self._decode(data)
+            except ValueError:
+                continue
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, int, int, Dict[str, Any]]]) -> None:
+        """Store (path, mtime_ns, size, summary) entries in a single transaction"""
+        try:
+            rows = [(path, mtime_ns, size, self._encode(summary)) for path, mtime_ns, size, summary in entries]
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO summaries (path, mtime_ns, size, json) VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Summary cache bulk write failed: {str(e)}")
+
+    def prune(self, keep_paths: Iterable[str]) -> int:
+        """Delete entries whose path is not in keep_paths (files removed or moved); returns the count"""
+        keep = set(keep_paths)
+        try:
+            with self._lock:
+                stale = [(path,) for (path,) in self._conn.execute("SELECT path FROM summaries") if path not in keep]
+                if stale:
+                    with self._conn:
+                        self._conn.execute("BEGIN")
+                        self._conn.executemany("DELETE FROM summaries WHERE path = ?", stale)
+        except sqlite3.Error as e:
+            logger.warning(f"Summary cache prune failed: {str(e)}")
+            return 0
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _encode(summary: Dict[str, Any]) -> bytes:
+        # orjson writes datetimes in isoformat(), offset included
+        return orjson.dumps(summary)
+
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, Any]:
+        summary = orjson.loads(data)
+        date = summary.get('date')
+        if isinstance(date, str):
+            # isoformat() round-trips naive and offset-aware datetimes alike
+            summary['date'] = datetime.fromisoformat(date)
+        return summary
@@ -197,7 +197,7 @@ class EmailReaderApp {
             });
             if (!res.ok) {
                 let detail = 'Failed to add domain';
-                try { const j = await res.json(); if (j && j.detail) detail = j.detail; } catch {}
+                try { const j = await res.json(); if (j && j.detail) detail = Array.isArray(j.detail) ? j.detail.map(e => e.msg).join('; ') : j.detail; } catch {}
                 throw new Error(detail);
             }
             // Hide modal
@@ -292,7 +292,7 @@ class EmailReaderApp {
             const res = await this.apiFetch(`/api/admin/domains/${encodeURIComponent(domain)}`, { method: 'DELETE' });
             if (!res.ok) {
                 let detail = 'Failed to delete domain';
-                try { const j = await res.json(); if (j && j.detail) detail = j.detail; } catch {}
+                try { const j = await res.json(); if (j && j.detail) detail = Array.isArray(j.detail) ? j.detail.map(e => e.msg).join('; ') : j.detail; } catch {}
                 throw new Error(detail);
             }
             this.showSuccess('Domain deleted');
@@ -319,7 +319,7 @@ class EmailReaderApp {
             });
             if (!res.ok) {
                 let detail = 'Failed to update domain';
-                try { const j = await res.json(); if (j && j.detail) detail = j.detail; } catch {}
+                try { const j = await res.json(); if (j && j.detail) detail = Array.isArray(j.detail) ? j.detail.map(e => e.msg).join('; ') : j.detail; } catch {}
                 throw new Error(detail);
             }
             this.showSuccess('Domain updated');
@@ -143,7 +143,7 @@ class DomainsPage {
       });
       if (!res.ok) {
         let detail = 'Failed to add domain';
-        try { const j = await res.json(); if (j && j.detail) detail = j.detail; } catch {}
+        try { const j = await res.json(); if (j && j.detail) detail = Array.isArray(j.detail) ? j.detail.map(e => e.msg).join('; ') : j.detail; } catch {}
         throw new Error(detail);
       }
       // Hide modal
@@ -228,7 +228,7 @@ class DomainsPage {
       const res = await this.apiFetch(`/api/admin/domains/${encodeURIComponent(domain)}`, { method: 'DELETE' });
       if (!res.ok) {
         let detail = 'Failed to delete domain';
-        try { const j = await res.json(); if (j && j.detail) detail = j.detail; } catch {}
+        try { const j = await res.json(); if (j && j.detail) detail = Array.isArray(j.detail) ? j.detail.map(e => e.msg).join('; ') : j.detail; } catch {}
         throw new Error(detail);
       }
       this.showToast('Domain deleted', 'success');
@@ -255,7 +255,7 @@ class DomainsPage {
       });
       if (!res.ok) {
         let detail = 'Failed to update domain';
-        try { const j = await res.json(); if (j && j.detail) detail = j.detail; } catch {}
+        try { const j = await res.json(); if (j && j.detail) detail = Array.isArray(j.detail) ? j.detail.map(e => e.msg).join('; ') : j.detail; } catch {}
         throw new Error(detail);
       }
       this.showToast('Domain updated', 'success');
@@ -0,0 +1,16 @@
+import os
+import time
+from functools import lru_cache
+
+# How long (seconds) a directory existence probe result is reused
+DIR_PROBE_TTL = 5
+
+
+@lru_cache(maxsize=8)
+def _dir_exists_cached(path: str, bucket: int) -> bool:
+    return os.path.isdir(path)
+
+
+def dir_exists_cached(path: str) -> bool:
+    """os.path.isdir() for static paths, re-probed at most once every DIR_PROBE_TTL seconds."""
+    return _dir_exists_cached(path, int(time.time()) // DIR_PROBE_TTL)
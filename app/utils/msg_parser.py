@@ -1,42 +1,95 @@
 import extract_msg
 import os
 import email
+import email.message
 import email.utils
 import email.header
 import quopri
 import html
 import base64
 import mimetypes
+import mmap
+import operator
 import re
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, NamedTuple, Dict, Any, Union
+from datetime import datetime, timedelta, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Outlook .msg files are OLE compound documents; anything else is read as RFC 2822
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+# How much of a plain body is inspected when deciding whether it is HTML
+HTML_SNIFF_CHARS = 4096
+
+# Outlook attachment properties read for every attachment, fetched in one call
+_OUTLOOK_ATTACHMENT_FIELDS = operator.attrgetter('longFilename', 'shortFilename', 'data', 'mimetype', 'contentId', 'cid')
+
+# cid: references in src/href attributes and CSS url(), rewritten to inline data URIs
+_CID_ATTR_RE = re.compile(r'\b(src|href)\s*=\s*["\']cid:([^"\']+)["\']', re.IGNORECASE)
+_CID_CSS_RE = re.compile(r"url\(['\"]cid:([^'\"]+)['\"]\)", re.IGNORECASE)
+_CID_PROBE_RE = re.compile(r'cid:', re.IGNORECASE)
+
+# Leftover quoted-printable escapes: soft line breaks, equals, spaces and CRLF
+_QP_FIXUP_RE = re.compile(r'=(?:\n|3D|20|0D=0A)')
+_QP_FIXUP_MAP = {'=\n': '', '=3D': '=', '=20': ' ', '=0D=0A': '\n'}
+# Any of the escapes that mark HTML as still quoted-printable encoded
+_QP_PROBE_RE = re.compile(r'=(?:20|3D|0[DA])')
+
+# Date zones that explicitly mean UTC (as opposed to a missing or "-0000" zone)
+_UTC_ZONE_RE = re.compile(r'\+0000|\b(?:UTC?|GMT|Z)\b', re.IGNORECASE)
+
+# Inline images are base64-encoded into data: URIs with the SIMD pybase64 codec (in requirements.txt;
+# stdlib base64 covers platforms without a pybase64 wheel).
+# Payloads are passed as memoryviews so bytes-like buffers are encoded in place, never copied first.
+try:
+    import pybase64
+
+    def _b64encode_str(data: Union[bytes, bytearray, memoryview]) -> str:
+        # Encodes straight into the result str, no intermediate bytes object
+        return pybase64.b64encode_as_string(memoryview(data))
+except ImportError:
+    def _b64encode_str(data: Union[bytes, bytearray, memoryview]) -> str:
+        return base64.b64encode(memoryview(data)).decode('ascii')
+
+class Attachment(NamedTuple):
+    """Attachment metadata in parsed email data; use _asdict() where a dict is needed (API/export)"""
+    filename: Optional[str]
+    size: int
+    content_type: str
+
 class MSGParser:
     """Utility class for parsing .msg email files"""
     
     @staticmethod
-    def parse_msg_file(file_path: str) -> Optional[Dict[str, Any]]:
+    def parse_msg_file(file_path: str, include_html: bool = True) -> Optional[Dict[str, Any]]:
         """
         Parse a .msg file and extract email information
         Supports both Outlook .msg files and RFC 2822 email files
         
         Args:
             file_path: Path to the .msg file
+            include_html: Whether to build html_body (with inlined CID images); when False
+                it is left as None and no HTML decoding or base64 encoding is done
             
         Returns:
             Dictionary containing parsed email data or None if parsing fails
         """
-        # First try to parse as Outlook .msg file
+        # Parse as Outlook .msg file when it carries the OLE signature
+        mm = None
         try:
-            with extract_msg.Message(file_path) as msg:
-                return MSGParser._extract_outlook_data(msg, file_path)
+            mm = MSGParser._map_outlook_file(file_path)
+            if mm is not None:
+                with extract_msg.Message(mm) as msg:
+                    return MSGParser._extract_outlook_data(msg, file_path, len(mm), include_html)
         except Exception as e:
             logger.debug(f"Failed to parse as Outlook MSG file {file_path}: {str(e)}")
-            # Try to parse as RFC 2822 email file
-            return MSGParser._parse_rfc2822_file(file_path)
+        finally:
+            if mm is not None:
+                mm.close()
+        # Try to parse as RFC 2822 email file
+        return MSGParser._parse_rfc2822_file(file_path, include_html)
     
     @staticmethod
     def get_msg_summary(file_path: str) -> Optional[Dict[str, Any]]:
@@ -50,17 +103,35 @@ class MSGParser:
         Returns:
             Dictionary containing email summary or None if parsing fails
         """
-        # First try to parse as Outlook .msg file
+        # Parse as Outlook .msg file when it carries the OLE signature
+        mm = None
         try:
-            with extract_msg.Message(file_path) as msg:
-                return MSGParser._extract_outlook_summary(msg, file_path)
+            mm = MSGParser._map_outlook_file(file_path)
+            if mm is not None:
+                with extract_msg.Message(mm) as msg:
+                    return MSGParser._extract_outlook_summary(msg, file_path, len(mm))
         except Exception as e:
             logger.debug(f"Failed to parse as Outlook MSG file {file_path}: {str(e)}")
-            # Try to parse as RFC 2822 email file for summary
-            return MSGParser._get_rfc2822_summary(file_path)
+        finally:
+            if mm is not None:
+                mm.close()
+        # Try to parse as RFC 2822 email file for summary
+        return MSGParser._get_rfc2822_summary(file_path)
+    
+    @staticmethod
+    def _map_outlook_file(file_path: str) -> Optional[mmap.mmap]:
+        """Read-only map of file_path if it is an OLE compound file, else None
+        
+        olefile reads the map as a file object, so the compound file is opened and paged in once;
+        len() of the map is the file size, so callers need no separate stat.
+        """
+        with open(file_path, 'rb') as f:
+            if f.read(len(OLE_MAGIC)) != OLE_MAGIC:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     
     @staticmethod
-    def _extract_outlook_data(msg, file_path: str) -> Dict[str, Any]:
+    def _extract_outlook_data(msg, file_path: str, size: int, include_html: bool = True) -> Dict[str, Any]:
         """Extract full data from Outlook .msg file"""
         # Extract recipients
         recipients = MSGParser._parse_recipients(msg.to, ';') if msg.to else []
@@ -68,41 +139,33 @@ class MSGParser:
         bcc = MSGParser._parse_recipients(msg.bcc, ';') if msg.bcc else []
         
         # Extract attachments information and prepare CID map for inline images
-        attachments = []
+        attachments: List[Attachment] = []
         cid_map = {}
         if msg.attachments:
             for attachment in msg.attachments:
-                att_filename = attachment.longFilename or attachment.shortFilename
-                att_bytes = attachment.data if hasattr(attachment, 'data') else None
-                att_type = getattr(attachment, 'mimetype', None)
+                att_filename, att_bytes, att_type, cid = MSGParser._outlook_attachment_fields(attachment)
                 if not att_type and att_filename:
-                    guessed, _ = mimetypes.guess_type(att_filename)
-                    att_type = guessed or 'application/octet-stream'
+                    att_type, _ = mimetypes.guess_type(att_filename)
+                ctype = att_type or 'application/octet-stream'
                 # Build attachment info for API consumers
-                att_info = {
-                    'filename': att_filename,
-                    'size': len(att_bytes) if att_bytes else 0,
-                    'content_type': att_type or 'application/octet-stream'
-                }
-                attachments.append(att_info)
+                attachments.append(Attachment(att_filename, len(att_bytes) if att_bytes else 0, ctype))
                 # Collect CID mapping if possible
-                cid = getattr(attachment, 'contentId', None) or getattr(attachment, 'cid', None)
-                if cid and att_bytes:
+                if include_html and cid and att_bytes:
                     cid_clean = cid.strip('<>')
                     try:
-                        b64 = base64.b64encode(att_bytes).decode('ascii')
-                        cid_map[cid_clean] = f"data:{att_type or 'application/octet-stream'};base64,{b64}"
+                        b64 = _b64encode_str(att_bytes)
+                        cid_map[cid_clean] = f"data:{ctype};base64,{b64}"
                     except Exception:
                         pass
 
-        # Robust sender extraction: sender, senderEmail, or From header
-        headers_dict = msg.header if hasattr(msg, 'header') else {}
-        sender_candidates = [
-            getattr(msg, 'sender', None),
-            getattr(msg, 'senderEmail', None),
-            (headers_dict.get('From') if isinstance(headers_dict, dict) else None),
-        ]
-        sender_raw = next((s for s in sender_candidates if s), 'Unknown Sender')
+        # Robust sender extraction: sender, senderEmail, or From header (only looked up as needed)
+        headers_dict = MSGParser._outlook_headers(msg)
+        sender_raw = (
+            getattr(msg, 'sender', None)
+            or getattr(msg, 'senderEmail', None)
+            or headers_dict.get('From')
+            or 'Unknown Sender'
+        )
         sender_decoded = MSGParser._decode_mime_header(sender_raw)
 
         # Normalize date to datetime when possible
@@ -111,23 +174,25 @@ class MSGParser:
             date_value = MSGParser._parse_email_date(date_value)
 
         # Determine and clean HTML body
-        html_body_candidates = [
-            getattr(msg, 'htmlBody', None),
-            getattr(msg, 'bodyHTML', None),
-            getattr(msg, 'bodyHtml', None),
-        ]
-        html_body = next((h for h in html_body_candidates if isinstance(h, str) and h.strip()), '')
-        html_body = MSGParser._clean_html_content(html_body)
+        html_body = None
+        if include_html:
+            html_body_candidates = [
+                getattr(msg, 'htmlBody', None),
+                getattr(msg, 'bodyHTML', None),
+                getattr(msg, 'bodyHtml', None),
+            ]
+            html_body = next((h for h in html_body_candidates if isinstance(h, str) and h.strip()), '')
+            html_body = MSGParser._clean_html_content(html_body)
 
-        # If HTML body missing but plain body contains HTML-like content, promote it
-        if not html_body and isinstance(msg.body, str):
-            body_str = (msg.body or '').strip()
-            if body_str.startswith('<') or '<html' in body_str.lower():
-                html_body = MSGParser._clean_html_content(body_str)
+            # If HTML body missing but plain body contains HTML-like content, promote it
+            if not html_body and isinstance(msg.body, str):
+                body_str = (msg.body or '').strip()
+                if MSGParser._looks_like_html(body_str):
+                    html_body = MSGParser._clean_html_content(body_str)
 
-        # Inline cid: images for Outlook messages
-        if html_body and cid_map:
-            html_body = MSGParser._inline_cid_sources(html_body, cid_map)
+            # Inline cid: images for Outlook messages
+            if html_body and cid_map:
+                html_body = MSGParser._inline_cid_sources(html_body, cid_map)
 
         return {
             'filename': os.path.basename(file_path),
@@ -137,27 +202,51 @@ class MSGParser:
             'body': msg.body,
             'html_body': html_body,
             'message_id': msg.messageId,
-            'size': os.path.getsize(file_path),
+            'size': size,
             'recipients': recipients,
             'cc': cc,
             'bcc': bcc,
             'attachments': attachments,
-            'headers': msg.header if hasattr(msg, 'header') else {}
+            'headers': headers_dict
         }
     
     @staticmethod
-    def _extract_outlook_summary(msg, file_path: str) -> Dict[str, Any]:
+    def _outlook_headers(msg) -> Dict[str, str]:
+        """Transport headers of an Outlook message as a plain str -> str dict
+        
+        extract_msg exposes them as an email.message.Message, which neither the API model
+        nor the JSON export can take as-is.
+        """
+        header = getattr(msg, 'header', None)
+        if header is None:
+            return {}
+        return {name: str(value) for name, value in header.items()}
+    
+    @staticmethod
+    def _outlook_attachment_fields(attachment) -> tuple[Optional[str], Optional[bytes], Optional[str], Optional[str]]:
+        """(filename, data, mimetype, content id) of an Outlook attachment"""
+        try:
+            long_name, short_name, data, mimetype, content_id, cid = _OUTLOOK_ATTACHMENT_FIELDS(attachment)
+        except AttributeError:
+            # Attachment kinds that lack some of the properties
+            long_name = getattr(attachment, 'longFilename', None)
+            short_name = getattr(attachment, 'shortFilename', None)
+            data = getattr(attachment, 'data', None)
+            mimetype = getattr(attachment, 'mimetype', None)
+            content_id = getattr(attachment, 'contentId', None)
+            cid = getattr(attachment, 'cid', None)
+        return long_name or short_name, data, mimetype, content_id or cid
+    
+    @staticmethod
+    def _extract_outlook_summary(msg, file_path: str, size: int) -> Dict[str, Any]:
         """Extract summary data from Outlook .msg file"""
         recipients = MSGParser._parse_recipients(msg.to, ';') if msg.to else []
+        attachments = msg.attachments
 
-        # Robust sender extraction for summary
-        headers_dict = msg.header if hasattr(msg, 'header') else {}
-        sender_candidates = [
-            getattr(msg, 'sender', None),
-            getattr(msg, 'senderEmail', None),
-            (headers_dict.get('From') if isinstance(headers_dict, dict) else None),
-        ]
-        sender_raw = next((s for s in sender_candidates if s), 'Unknown Sender')
+        # Robust sender extraction for summary; the header is only read without a sender property
+        sender_raw = getattr(msg, 'sender', None) or getattr(msg, 'senderEmail', None)
+        if not sender_raw:
+            sender_raw = MSGParser._outlook_headers(msg).get('From') or 'Unknown Sender'
         sender_decoded = MSGParser._decode_mime_header(sender_raw)
 
         # Normalize date to datetime when possible
@@ -170,36 +259,47 @@ class MSGParser:
             'subject': MSGParser._decode_mime_header(msg.subject or 'No Subject'),
             'sender': sender_decoded,
             'date': date_value,
-            'size': os.path.getsize(file_path),
-            'has_attachments': bool(msg.attachments),
-            'attachment_count': len(msg.attachments) if msg.attachments else 0,
+            'size': size,
+            'has_attachments': bool(attachments),
+            'attachment_count': len(attachments) if attachments else 0,
             'recipients': recipients
         }
     
     @staticmethod
-    def _parse_rfc2822_file(file_path: str) -> Optional[Dict[str, Any]]:
+    def _read_rfc2822(file_path: str) -> tuple[email.message.Message, int]:
+        """Parse an RFC 2822 file into a Message, returning it with the file size
+        
+        The file is read as UTF-8 text rather than handed to message_from_bytes: with the
+        compat32 policy, bytes parsing turns 8-bit headers into unknown-8bit Header objects
+        instead of str, and the feed parser dominates the cost either way.
+        """
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            size = os.fstat(f.fileno()).st_size
+            return email.message_from_file(f), size
+    
+    @staticmethod
+    def _parse_rfc2822_file(file_path: str, include_html: bool = True) -> Optional[Dict[str, Any]]:
         """
         Parse an RFC 2822 email file (raw email format)
         
         Args:
             file_path: Path to the email file
+            include_html: Whether to build html_body; None is returned for it otherwise
             
         Returns:
             Dictionary containing parsed email data or None if parsing fails
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                msg = email.message_from_file(f)
+            msg, size = MSGParser._read_rfc2822(file_path)
             
             # Parse date
             parsed_date = MSGParser._parse_email_date(msg.get('Date'))
             
-            # Extract body with proper decoding
-            body, html_body = MSGParser._extract_email_bodies(msg)
+            # Bodies, inline images and attachments from a single walk over the parts
+            body, html_body, cid_map, attachments = MSGParser._walk_parts_once(msg, include_html)
             
             # Inline CID images if present
             try:
-                cid_map = MSGParser._build_cid_map_rfc(msg)
                 if html_body and cid_map:
                     html_body = MSGParser._inline_cid_sources(html_body, cid_map)
             except Exception:
@@ -210,9 +310,6 @@ class MSGParser:
             cc = MSGParser._parse_recipients(msg.get('Cc', ''), ',')
             bcc = MSGParser._parse_recipients(msg.get('Bcc', ''), ',')
             
-            # Extract attachments
-            attachments = MSGParser._extract_rfc2822_attachments(msg)
-            
             return {
                 'filename': os.path.basename(file_path),
                 'subject': MSGParser._decode_mime_header(msg.get('Subject', 'No Subject')),
@@ -221,7 +318,7 @@ class MSGParser:
                 'body': body,
                 'html_body': html_body,
                 'message_id': msg.get('Message-ID'),
-                'size': os.path.getsize(file_path),
+                'size': size,
                 'recipients': recipients,
                 'cc': cc,
                 'bcc': bcc,
@@ -245,8 +342,7 @@ class MSGParser:
             Dictionary containing email summary or None if parsing fails
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                msg = email.message_from_file(f)
+            msg, size = MSGParser._read_rfc2822(file_path)
             
             # Parse date
             parsed_date = MSGParser._parse_email_date(msg.get('Date'))
@@ -262,7 +358,7 @@ class MSGParser:
                 'subject': MSGParser._decode_mime_header(msg.get('Subject', 'No Subject')),
                 'sender': MSGParser._decode_mime_header(msg.get('From', 'Unknown Sender')),
                 'date': parsed_date,
-                'size': os.path.getsize(file_path),
+                'size': size,
                 'has_attachments': has_attachments,
                 'attachment_count': attachment_count,
                 'recipients': recipients
@@ -284,28 +380,63 @@ class MSGParser:
         """Parse email date string"""
         if not date_str:
             return None
+        parsed = email.utils.parsedate_tz(date_str)
+        if parsed is None:
+            return None
+        *fields, offset = parsed
+        # parsedate_tz reports a missing (or "-0000", i.e. unknown) zone as offset 0; like
+        # parsedate_to_datetime, such dates stay naive unless the zone is spelled out as UTC
+        if offset == 0 and not _UTC_ZONE_RE.search(date_str):
+            tzinfo = None
+        else:
+            tzinfo = timezone(timedelta(seconds=offset))
         try:
-            return email.utils.parsedate_to_datetime(date_str)
-        except Exception:
+            return datetime(*fields[:6], tzinfo=tzinfo)
+        except ValueError:
+            # Out-of-range fields, e.g. "31 Feb"
             return None
     
     @staticmethod
-    def _extract_email_bodies(msg) -> tuple[str, str]:
-        """Extract plain text and HTML bodies from email message"""
+    def _walk_parts_once(msg, include_html: bool = True) -> tuple[str, Optional[str], Dict[str, str], List[Attachment]]:
+        """Extract plain/HTML bodies, CID -> data: URI map and attachments in one walk
+        
+        Each part's payload is decoded at most once and shared by the three uses. With
+        include_html=False, HTML parts and Content-IDs are skipped and html_body is None.
+        """
         body = ""
         html_body = ""
+        cid_map: Dict[str, str] = {}
+        attachments: List[Attachment] = []
         
         if msg.is_multipart():
             for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    payload = part.get_payload(decode=True)
+                content_type = part.get_content_type()
+                cid = part.get('Content-ID') if include_html else None
+                is_attachment = part.get_content_disposition() == 'attachment'
+                is_body = content_type == "text/plain" or (include_html and content_type == "text/html")
+                if not is_body and not cid and not is_attachment:
+                    continue
+                payload = part.get_payload(decode=True)
+                
+                if content_type == "text/plain":
                     if payload:
                         body = MSGParser._decode_content(payload, part.get('Content-Transfer-Encoding', ''))
-                elif part.get_content_type() == "text/html":
-                    payload = part.get_payload(decode=True)
-                    if payload:
+                elif content_type == "text/html":
+                    if payload and include_html:
                         html_body = MSGParser._decode_content(payload, part.get('Content-Transfer-Encoding', ''))
-                        html_body = MSGParser._clean_html_content(html_body)
+                        html_body = MSGParser._clean_html_content(html_body, is_raw=False)
+                
+                if cid and payload:
+                    try:
+                        b64 = _b64encode_str(payload)
+                        cid_map[cid.strip().strip('<>')] = f"data:{content_type};base64,{b64}"
+                    except Exception:
+                        pass
+                
+                if is_attachment:
+                    filename = part.get_filename()
+                    if filename:
+                        attachments.append(Attachment(filename, len(payload or b''), content_type))
         else:
             payload = msg.get_payload(decode=True)
             if payload:
@@ -313,49 +444,38 @@ class MSGParser:
                 if msg.get_content_type() == "text/plain":
                     body = content
                 elif msg.get_content_type() == "text/html":
-                    html_body = MSGParser._clean_html_content(content)
+                    html_body = MSGParser._clean_html_content(content, is_raw=False)
                 else:
                     # If no specific content type, try to detect HTML
                     if content.strip().startswith('<'):
-                        html_body = MSGParser._clean_html_content(content)
+                        html_body = MSGParser._clean_html_content(content, is_raw=False)
                     else:
                         body = content
 
+        if not include_html:
+            return body, None, cid_map, attachments
+
         # Final fallback: if HTML missing but body looks like HTML, promote it
-        if not html_body and body and (body.strip().startswith('<') or '<html' in body.lower()):
-            html_body = MSGParser._clean_html_content(body)
+        if not html_body and body and MSGParser._looks_like_html(body):
+            html_body = MSGParser._clean_html_content(body, is_raw=False)
 
-        return body, html_body
+        return body, html_body, cid_map, attachments
 
     @staticmethod
-    def _build_cid_map_rfc(msg) -> Dict[str, str]:
-        """Build CID -> data: URI map from RFC 2822 message parts"""
-        cid_map: Dict[str, str] = {}
-        try:
-            if msg.is_multipart():
-                for part in msg.walk():
-                    cid = part.get('Content-ID')
-                    if not cid:
-                        continue
-                    cid_clean = cid.strip().strip('<>')
-                    payload = part.get_payload(decode=True)
-                    if not payload:
-                        continue
-                    ctype = part.get_content_type() or 'application/octet-stream'
-                    try:
-                        b64 = base64.b64encode(payload).decode('ascii')
-                        cid_map[cid_clean] = f"data:{ctype};base64,{b64}"
-                    except Exception:
-                        continue
-        except Exception:
-            pass
-        return cid_map
+    def _looks_like_html(text: str) -> bool:
+        """Whether a plain body is really HTML: it opens with a tag or has <html near the top"""
+        # Only the head is lowercased and scanned, whatever the body's size
+        head = text[:HTML_SNIFF_CHARS].lstrip()
+        return head.startswith('<') or '<html' in head.lower()
 
     @staticmethod
     def _inline_cid_sources(html_content: str, cid_map: Dict[str, str]) -> str:
         """Replace cid: URLs in src/href/url() with data URIs from cid_map"""
         if not html_content or not cid_map:
             return html_content
+        # Both patterns need a "cid:" (any case); most HTML has none, so skip the regex passes
+        if not _CID_PROBE_RE.search(html_content):
+            return html_content
 
         def replace_attr(match: re.Match) -> str:
             attr = match.group(1)
@@ -375,35 +495,18 @@ class MSGParser:
             return match.group(0)
 
         # Replace src/href="cid:..."
-        html_content = re.sub(r'(?i)\b(src|href)\s*=\s*["\']cid:([^"\']+)["\']', replace_attr, html_content)
+        html_content = _CID_ATTR_RE.sub(replace_attr, html_content)
         # Replace url('cid:...') in inline styles
-        html_content = re.sub(r"(?i)url\(['\"]cid:([^'\"]+)['\"]\)", replace_css, html_content)
+        html_content = _CID_CSS_RE.sub(replace_css, html_content)
         return html_content
     
-    @staticmethod
-    def _extract_rfc2822_attachments(msg) -> List[Dict[str, Any]]:
-        """Extract attachments from RFC 2822 message"""
-        attachments = []
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_disposition() == 'attachment':
-                    filename = part.get_filename()
-                    if filename:
-                        attachments.append({
-                            'filename': filename,
-                            'size': len(part.get_payload(decode=True) or b''),
-                            'content_type': part.get_content_type()
-                        })
-        return attachments
-    
     @staticmethod
     def _count_rfc2822_attachments(msg) -> tuple[bool, int]:
         """Count attachments in RFC 2822 message"""
-        attachment_count = 0
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_disposition() == 'attachment':
-                    attachment_count += 1
+        # A single-part message is read as its body, never as an attachment (see _walk_parts_once)
+        if not msg.is_multipart():
+            return False, 0
+        attachment_count = sum(1 for part in msg.walk() if part.get_content_disposition() == 'attachment')
         return attachment_count > 0, attachment_count
     
     @staticmethod
@@ -424,17 +527,17 @@ class MSGParser:
                 decoded_bytes = quopri.decodestring(payload)
                 content = decoded_bytes.decode('utf-8', errors='ignore')
             else:
-                # Try to decode as UTF-8 first, then fallback
-                try:
-                    content = payload.decode('utf-8')
-                except UnicodeDecodeError:
+                # Plain ASCII needs no fallback; otherwise UTF-8, then Latin-1 (which accepts every byte)
+                if payload.isascii():
+                    content = payload.decode('ascii')
+                else:
                     try:
-                        content = payload.decode('iso-8859-1')
+                        content = payload.decode('utf-8')
                     except UnicodeDecodeError:
-                        content = payload.decode('utf-8', errors='ignore')
+                        content = payload.decode('iso-8859-1')
             
-            # Clean up common encoding issues
-            content = MSGParser._clean_encoded_content(content)
+                # Clean up common encoding issues; a quopri-decoded body has none left
+                content = MSGParser._clean_encoded_content(content)
             
             return content
             
@@ -445,11 +548,8 @@ class MSGParser:
     @staticmethod
     def _clean_encoded_content(content: str) -> str:
         """Clean up common encoding issues in content"""
-        content = content.replace('=\n', '')  # Remove soft line breaks
-        content = content.replace('=3D', '=')  # Fix quoted-printable equals
-        content = content.replace('=20', ' ')  # Fix quoted-printable spaces
-        content = content.replace('=0D=0A', '\n')  # Fix line breaks
-        return content
+        # One pass over the body instead of one str.replace per escape
+        return _QP_FIXUP_RE.sub(lambda m: _QP_FIXUP_MAP[m.group(0)], content)
     
     @staticmethod
     def _decode_mime_header(header_value: str) -> str:
@@ -457,6 +557,10 @@ class MSGParser:
         if not header_value:
             return ""
         
+        # Most headers carry no RFC 2047 encoded-words, and decode_header would return them as-is
+        if '=?' not in header_value:
+            return header_value.strip()
+        
         try:
             # Decode MIME header encoding
             decoded_parts = email.header.decode_header(header_value)
@@ -466,16 +570,14 @@ class MSGParser:
                 if isinstance(part, bytes):
                     if encoding:
                         decoded_string += part.decode(encoding, errors='ignore')
+                    elif part.isascii():
+                        decoded_string += part.decode('ascii')
                     else:
-                        # Try common encodings if none specified
-                        for enc in ['utf-8', 'iso-8859-1', 'windows-1252']:
-                            try:
-                                decoded_string += part.decode(enc)
-                                break
-                            except UnicodeDecodeError:
-                                continue
-                        else:
-                            decoded_string += part.decode('utf-8', errors='ignore')
+                        # UTF-8 when valid, else Latin-1, which accepts every byte
+                        try:
+                            decoded_string += part.decode('utf-8')
+                        except UnicodeDecodeError:
+                            decoded_string += part.decode('iso-8859-1')
                 else:
                     decoded_string += str(part)
             
@@ -485,19 +587,24 @@ class MSGParser:
             return header_value
 
     @staticmethod
-    def _clean_html_content(html_content: str) -> str:
-        """Clean and decode HTML content"""
+    def _clean_html_content(html_content: str, is_raw: bool = True) -> str:
+        """Clean and decode HTML content
+        
+        is_raw=False marks content already passed through _decode_content, which has
+        handled quoted-printable, so it isn't scanned for escapes again.
+        """
         if not html_content:
             return ""
         
         try:
             # Decode quoted-printable if present
-            if '=' in html_content and any(c in html_content for c in ['=20', '=3D', '=0D', '=0A']):
+            if is_raw and '=' in html_content and _QP_PROBE_RE.search(html_content):
                 html_content = quopri.decodestring(html_content).decode('utf-8', errors='ignore')
             
             # Clean up common HTML encoding issues
             html_content = html_content.replace('&shy;', '')  # Remove soft hyphens
-            html_content = MSGParser._clean_encoded_content(html_content)
+            if is_raw:
+                html_content = MSGParser._clean_encoded_content(html_content)
             
             return html_content
         except Exception as e:
@@ -12,5 +12,7 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        # uvicorn[standard] picks uvloop/httptools automatically where available (not on Windows)
+        workers=1 if settings.DEBUG else settings.WORKERS,
         log_level="info"
     )